@@ -9,22 +9,6 @@ and Gemini to analyze ML experiments.
 import os
 
 from mcp import StdioServerParameters
-
-# Load environment variables from .env file
-try:
-    from dotenv import load_dotenv
-
-    load_dotenv()
-except ImportError:
-    print("dotenv package not found, skipping.")
-
-# Set up Gemini API key
-GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY environment variable not set")
-
-os.environ["GOOGLE_API_KEY"] = GEMINI_API_KEY
-
 from smolagents import CodeAgent, MCPClient
 from smolagents.models import GeminiModel
 
@@ -34,10 +18,25 @@ def main():
     print("🔬 Simple ClearML Analysis Example")
     print("=" * 40)
 
+    # Load environment variables from .env file
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+    except ImportError:
+        print("dotenv package not found, skipping.")
+
+    # Set up Gemini API key
+    gemini_api_key = os.environ.get("GEMINI_API_KEY")
+    if not gemini_api_key:
+        raise ValueError("GEMINI_API_KEY environment variable not set")
+
+    os.environ["GOOGLE_API_KEY"] = gemini_api_key
+
     # Initialize Gemini model
     model = GeminiModel(
         model_id="gemini-1.5-flash",
-        api_key=GEMINI_API_KEY,
+        api_key=gemini_api_key,
     )
 
     # Configure ClearML MCP server
@@ -51,7 +50,7 @@ def main():
         agent = CodeAgent(
             tools=tools,
             model=model,
-            add_base_tools=True,
+            add_base_tools=False,  # Only ClearML tools; base tools just inflate the prompt
         )
 
         # Simple analysis query
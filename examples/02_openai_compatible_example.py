@@ -12,62 +12,345 @@ Requirements:
 - ClearML configuration (~/.clearml.conf)
 """
 
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
 import os
+import sys
+import threading
+from types import SimpleNamespace
 
-from mcp import StdioServerParameters
 
-# Load environment variables from .env file
-try:
-    from dotenv import load_dotenv
+def load_environment():
+    """Load environment variables from a .env file, if python-dotenv is available."""
+    try:
+        from dotenv import load_dotenv
 
-    load_dotenv()
-except ImportError:
-    print("dotenv package not found, skipping.")
+        load_dotenv()
+    except ImportError:
+        print("dotenv package not found, skipping.")
+
+
+def _print_install_hint():
+    print("❌ Required packages not found. Install with:")
+    print("   uv sync --group examples")
+    print("   or")
+    print("   pip install 'smolagents[openai,mcp]' rich")
 
-# Set up Gemini API key
-GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY environment variable not set")
 
 try:
     from rich.console import Console
+    from rich.live import Live
     from rich.panel import Panel
     from rich.progress import Progress, SpinnerColumn, TextColumn
-    from smolagents import CodeAgent, MCPClient, OpenAIServerModel
+    from rich.spinner import Spinner
 except ImportError:
-    print("❌ Required packages not found. Install with:")
-    print("   uv sync --group examples")
-    print("   or")
-    print("   pip install 'smolagents[openai,mcp]' rich")
+    _print_install_hint()
     raise
 
 console = Console()
 
 
+@functools.lru_cache(maxsize=1)
+def _load_analysis_deps():
+    """Import the agent stack on first use, so startup and mode selection stay fast."""
+    try:
+        from agent_setup import (
+            PrefetchingCodeAgent,
+            clearml_server_params,
+            create_gemini_model,
+            warm_up_model,
+        )
+        from streaming import quiet_logger, stream_run
+        from tool_cache import LazyMCPClient, cached_tools
+    except ImportError:
+        _print_install_hint()
+        raise
+
+    return SimpleNamespace(
+        CodeAgent=PrefetchingCodeAgent,
+        LazyMCPClient=LazyMCPClient,
+        create_gemini_model=create_gemini_model,
+        clearml_server_params=clearml_server_params,
+        cached_tools=cached_tools,
+        quiet_logger=quiet_logger,
+        stream_run=stream_run,
+        warm_up_model=warm_up_model,
+    )
+
+
 def create_clearml_analysis_agent():
-    """Create a ClearML analysis agent using Gemini 2.0 Flash via OpenAI API."""
-    # Initialize Gemini model via OpenAI-compatible API
-    model = OpenAIServerModel(
-        model_id="gemini-2.0-flash",
-        # Google Gemini OpenAI-compatible API base URL
-        api_base="https://generativelanguage.googleapis.com/v1beta/openai/",
-        api_key=GEMINI_API_KEY,
-        temperature=0.1,  # Lower temperature for more focused analysis
+    """Return the Gemini 2.0 Flash model and ClearML MCP server parameters.
+
+    Both are memoized in `agent_setup`, so every mode shares the same model (and its
+    HTTP client). The server environment is captured on the first call.
+    """
+    deps = _load_analysis_deps()
+    return deps.create_gemini_model(), deps.clearml_server_params()
+
+
+def build_agent(clearml_tools, verbosity_level=1, *, stream=False):
+    """Create a CodeAgent over the ClearML tools, sharing the cached model.
+
+    With ``stream=True`` the agent streams model output for `stream_run` to render,
+    and its own logging is silenced so the two displays don't fight.
+    """
+    deps = _load_analysis_deps()
+    model, _ = create_clearml_analysis_agent()
+    streaming_kwargs = {"stream_outputs": True, "logger": deps.quiet_logger()} if stream else {}
+    return deps.CodeAgent(
+        tools=clearml_tools,
+        model=model,
+        add_base_tools=False,  # Only use ClearML tools
+        verbosity_level=verbosity_level,
+        **streaming_kwargs,
     )
 
-    # Configure ClearML MCP server parameters
-    # Use local installation since we haven't published to PyPI yet
-    clearml_server_params = StdioServerParameters(
-        command="python",
-        args=["-m", "clearml_mcp.clearml_mcp"],
-        env=os.environ,  # Pass through environment variables
+
+@contextlib.contextmanager
+def mcp_session():
+    """Open one ClearML MCP stdio session.
+
+    Yields a single agent bound to its tools, the tools, and the MCP client.
+    """
+    deps = _load_analysis_deps()
+    _, clearml_server_params = create_clearml_analysis_agent()
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+    ) as progress:
+        connect_task = progress.add_task("[cyan]Connecting to ClearML MCP server...", total=None)
+        # With cached tool schemas the server is only spawned on the first tool call
+        client = deps.LazyMCPClient(clearml_server_params)
+        status = (
+            "✅ Connected to ClearML MCP server"
+            if client.connected
+            else "✅ Loaded ClearML MCP tools from cache"
+        )
+        progress.update(connect_task, description=f"[green]{status}")
+
+    try:
+        # Serve repeated tool calls from the on-disk cache
+        clearml_tools = deps.cached_tools(client.get_tools())
+        console.print(f"[green]🛠️  Available tools: {len(clearml_tools)} ClearML MCP tools[/green]")
+
+        yield build_agent(clearml_tools, stream=True), clearml_tools, client
+    finally:
+        client.disconnect()
+
+
+def in_daemon_thread(func, *args: object):
+    """Run func in a daemon thread and return an awaitable future for its result.
+
+    Unlike asyncio.to_thread, a call that is still running (an unanswered prompt, a
+    slow warm-up request) can't hold up interpreter exit.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(result, error):
+        if future.done():
+            return
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    def target():
+        try:
+            result, error = func(*args), None
+        except Exception as e:
+            result, error = None, e
+        with contextlib.suppress(RuntimeError):  # Event loop already closed
+            loop.call_soon_threadsafe(settle, result, error)
+
+    threading.Thread(target=target, daemon=True).start()
+    return future
+
+
+# How long the first query waits for the warm-up before going ahead anyway
+WARMUP_TIMEOUT = 10  # seconds
+
+
+def start_warm_up(client):
+    """Open the Gemini connection and start the MCP server in the background.
+
+    Call from a running event loop, then print banners while it works. Failures are
+    ignored here; the first real query reports them.
+    """
+    deps = _load_analysis_deps()
+    model, _ = create_clearml_analysis_agent()
+    return asyncio.gather(
+        in_daemon_thread(deps.warm_up_model, model),
+        in_daemon_thread(client.connect),
+        return_exceptions=True,
     )
 
-    return model, clearml_server_params
 
+async def finish_warm_up(warmup):
+    """Give the warm-up up to WARMUP_TIMEOUT seconds to finish before the first query."""
+    await asyncio.wait({warmup}, timeout=WARMUP_TIMEOUT)
+
+
+# Sections of the batched experiment report, in display order
+REPORT_SECTIONS = (
+    ("health", "🩺 Experiment Health"),
+    ("trends", "📈 Training Trends"),
+    ("hyperparameters", "⚙️ Hyperparameters"),
+    ("recommendations", "💡 Recommendations"),
+)
+
+
+def parse_report(result):
+    """Parse the agent's JSON report, tolerating dict answers and ```json fences.
+
+    Raises TypeError if the answer is valid JSON but not an object.
+    """
+    if isinstance(result, dict):
+        return result
+    text = str(result).strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    report = json.loads(text)
+    if not isinstance(report, dict):
+        raise TypeError(f"Expected a JSON object, got {type(report).__name__}")
+    return report
+
+
+def render_report(result):
+    """Render each section of a batched experiment report in its own panel."""
+    try:
+        report = parse_report(result)
+    except (json.JSONDecodeError, TypeError):
+        # Not a JSON object - show the raw answer rather than losing it
+        console.print(
+            Panel(
+                f"[bold green]📊 Analysis Results[/bold green]\n\n{result}",
+                border_style="green",
+                padding=(1, 2),
+            )
+        )
+        return
+
+    for key, title in REPORT_SECTIONS:
+        section = report.get(key, "[dim]Not provided[/dim]")
+        if not isinstance(section, str):
+            section = json.dumps(section, indent=2)
+        console.print(
+            Panel(
+                f"[bold green]{title}[/bold green]\n\n{section}",
+                border_style="green",
+                padding=(1, 2),
+            )
+        )
+
+
+EXPERIMENT_ID = "efe5f7a6c5f34a15b4bfbf1c33660e20"
+PREVIEW_CHARS = 200
+
+# Enhanced example queries that showcase different ClearML operations.
+# Templates take the experiment ID via str.format(exp=...), so they are built once.
+GENERAL_QUERIES = (
+    {
+        "title": "🏗️ Project Overview",
+        "query": "List all available ClearML projects and give me a detailed summary of what projects are available, including their purposes.",
+        "icon": "📊",
+    },
+    {
+        "title": "🔍 Intelligent Search",
+        "query": "Search for experiments that contain keywords like 'training', 'model', 'neural', or 'learning' in their names or descriptions. Show me the most relevant results and categorize them by type.",
+        "icon": "🔎",
+    },
+)
+
+# Per-section experiment queries - each one re-fetches overlapping task data
+GRANULAR_QUERIES = (
+    {
+        "title": "🔬 Experiment Deep Dive",
+        "query": "Get comprehensive information about the experiment with ID '{exp}'. Analyze its status, parameters, metrics, and provide detailed insights about this experiment's configuration and performance.",
+        "icon": "🧪",
+    },
+    {
+        "title": "📈 Performance Analytics",
+        "query": "Retrieve and analyze the training metrics for experiment '{exp}'. Look at the performance trends, convergence patterns, and provide insights about the training progress and model quality.",
+        "icon": "📉",
+    },
+    {
+        "title": "⚙️ Hyperparameter Analysis",
+        "query": "Examine the hyperparameters and configuration for experiment '{exp}'. Analyze the optimization settings, learning rates, batch sizes, and other key parameters. Suggest potential improvements.",
+        "icon": "🎛️",
+    },
+)
+
+# The same analyses in one pass: fetch each tool result once, reason over it four ways
+REPORT_QUERY = {
+    "title": "🔬 Experiment Report",
+    "query": "Analyze the ClearML experiment with ID '{exp}'. "
+    "Call each clearml-mcp tool you need (get_task_info, get_task_metrics, get_task_parameters) "
+    "at most once, then reason over the results. "
+    "Return a JSON object with keys health, trends, hyperparameters, recommendations. "
+    "health: status and configuration sanity; trends: convergence and training progress "
+    "from the metrics; hyperparameters: optimization settings, learning rates, batch sizes; "
+    "recommendations: concrete suggested improvements. Each value must be a string.",
+    "icon": "🧪",
+    "report": True,
+}
+
+
+def _fill(template, exp_id=None):
+    query = template["query"].format(exp=exp_id)
+    preview = query[:PREVIEW_CHARS] + ("…" if len(query) > PREVIEW_CHARS else "")
+    return {**template, "query": query, "preview": preview}
+
+
+def build_analysis_queries(exp_ids, *, granular=False):
+    """Fill the query templates, precomputing each panel preview.
+
+    The general queries run once; the experiment queries are repeated for each ID.
+    """
+    experiment_templates = GRANULAR_QUERIES if granular else (REPORT_QUERY,)
+    return [
+        _fill(GENERAL_QUERIES[0]),
+        *(_fill(template, exp_id) for exp_id in exp_ids for template in experiment_templates),
+        _fill(GENERAL_QUERIES[1]),
+    ]
+
+
+# Upper bound on analyses in flight at once; each slot gets its own agent
+MAX_CONCURRENT_QUERIES = 5
+RETRY_ATTEMPTS = 3
+
+
+async def _run_one(pool, query):
+    """Run a query on a free agent from the pool, retrying with exponential backoff."""
+    agent = await pool.get()
+    try:
+        for attempt in range(1, RETRY_ATTEMPTS):
+            try:
+                return await asyncio.to_thread(agent.run, query)
+            except Exception:
+                await asyncio.sleep(2**attempt)
+        return await asyncio.to_thread(agent.run, query)
+    finally:
+        pool.put_nowait(agent)
+
+
+async def demonstrate_clearml_analysis(clearml_tools, exp_ids, *, granular=False, client=None):
+    """Demonstrate various ClearML analysis capabilities with rich formatting.
+
+    The queries are independent, so they run concurrently on a small pool of agents
+    (CodeAgent keeps per-run state, so agents are not shared between slots).
+
+    By default the experiment-specific analyses are batched into one report query so
+    each ClearML tool is called once; ``granular=True`` runs them as separate queries.
+    With the MCP ``client``, connections are warmed up while the banner is shown.
+    """
+    warmup = start_warm_up(client) if client is not None else None
 
-def demonstrate_clearml_analysis():
-    """Demonstrate various ClearML analysis capabilities with rich formatting."""
     console.print(
         Panel.fit(
             "[bold blue]🚀 ClearML Analysis Agent[/bold blue]\n"
@@ -76,127 +359,117 @@ def demonstrate_clearml_analysis():
         )
     )
 
-    # Create the model and server parameters
-    model, clearml_server_params = create_clearml_analysis_agent()
-
-    # Enhanced example queries that showcase different ClearML operations
-    analysis_queries = [
-        {
-            "title": "🏗️ Project Overview",
-            "query": "List all available ClearML projects and give me a detailed summary of what projects are available, including their purposes.",
-            "icon": "📊",
-        },
-        {
-            "title": "🔬 Experiment Deep Dive",
-            "query": "Get comprehensive information about the experiment with ID 'efe5f7a6c5f34a15b4bfbf1c33660e20'. Analyze its status, parameters, metrics, and provide detailed insights about this experiment's configuration and performance.",
-            "icon": "🧪",
-        },
-        {
-            "title": "📈 Performance Analytics",
-            "query": "Retrieve and analyze the training metrics for experiment 'efe5f7a6c5f34a15b4bfbf1c33660e20'. Look at the performance trends, convergence patterns, and provide insights about the training progress and model quality.",
-            "icon": "📉",
-        },
-        {
-            "title": "🔍 Intelligent Search",
-            "query": "Search for experiments that contain keywords like 'training', 'model', 'neural', or 'learning' in their names or descriptions. Show me the most relevant results and categorize them by type.",
-            "icon": "🔎",
-        },
-        {
-            "title": "⚙️ Hyperparameter Analysis",
-            "query": "Examine the hyperparameters and configuration for experiment 'efe5f7a6c5f34a15b4bfbf1c33660e20'. Analyze the optimization settings, learning rates, batch sizes, and other key parameters. Suggest potential improvements.",
-            "icon": "🎛️",
-        },
-    ]
+    analysis_queries = build_analysis_queries(exp_ids, granular=granular)
+
+    # Quiet agents: concurrent runs would otherwise interleave their step logs
+    pool = asyncio.Queue()
+    for _ in range(min(MAX_CONCURRENT_QUERIES, len(analysis_queries))):
+        pool.put_nowait(build_agent(clearml_tools, verbosity_level=0))
+
+    console.print()
 
-    # Connect to ClearML MCP server and run analysis
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         console=console,
     ) as progress:
-        connect_task = progress.add_task("[cyan]Connecting to ClearML MCP server...", total=None)
+        if warmup is not None:
+            await finish_warm_up(warmup)
+        progress.add_task(
+            f"[yellow]🤔 Running {len(analysis_queries)} analyses concurrently...", total=None
+        )
+        results = await asyncio.gather(
+            *(_run_one(pool, analysis["query"]) for analysis in analysis_queries),
+            return_exceptions=True,
+        )
 
-        with MCPClient(clearml_server_params) as clearml_tools:
-            progress.update(connect_task, description="[green]✅ Connected to ClearML MCP server")
-            progress.stop()
+    # gather() preserves input order, so results print in query order
+    for analysis, result in zip(analysis_queries, results, strict=True):
+        console.print(
+            Panel(
+                f"[bold]{analysis['icon']} {analysis['title']}[/bold]\n\n"
+                f"[dim]Query:[/dim] {analysis['preview']}",
+                border_style="cyan",
+                padding=(1, 2),
+            )
+        )
 
+        if isinstance(result, Exception):
             console.print(
-                f"[green]🛠️  Available tools: {len(clearml_tools)} ClearML MCP tools[/green]"
+                Panel(
+                    f"[bold red]❌ Analysis Failed[/bold red]\n\n"
+                    f"Error: {result!s}\n\n"
+                    f"[dim]This might be due to:[/dim]\n"
+                    f"• ClearML configuration issues\n"
+                    f"• Invalid experiment ID\n"
+                    f"• Network connectivity problems\n"
+                    f"• API rate limits",
+                    border_style="red",
+                    padding=(1, 2),
+                )
             )
-
-            # Create agent with ClearML tools
-            agent = CodeAgent(
-                tools=clearml_tools,
-                model=model,
-                add_base_tools=False,  # Only use ClearML tools
-                verbosity_level=1,  # Show tool usage
+        elif analysis.get("report"):
+            render_report(result)
+        else:
+            console.print(
+                Panel(
+                    f"[bold green]📊 Analysis Results[/bold green]\n\n{result}",
+                    border_style="green",
+                    padding=(1, 2),
+                )
             )
 
-            console.print()
+        console.print()
 
-            # Run each analysis query
-            for i, analysis in enumerate(analysis_queries, 1):
-                console.print(
-                    Panel(
-                        f"[bold]{analysis['icon']} {analysis['title']}[/bold]\n\n"
-                        f"[dim]Query:[/dim] {analysis['query']}",
-                        border_style="cyan",
-                        padding=(1, 2),
-                    )
-                )
+    console.print(
+        Panel.fit(
+            "[bold green]🎉 All analyses completed successfully![/bold green]",
+            border_style="green",
+        )
+    )
 
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    console=console,
-                ) as analysis_progress:
-                    task = analysis_progress.add_task(
-                        "[yellow]🤔 Agent thinking and analyzing...", total=None
-                    )
 
-                    try:
-                        result = agent.run(analysis["query"])
-                        analysis_progress.update(task, description="[green]✅ Analysis complete!")
-                        analysis_progress.stop()
-
-                        console.print(
-                            Panel(
-                                f"[bold green]📊 Analysis Results[/bold green]\n\n{result}",
-                                border_style="green",
-                                padding=(1, 2),
-                            )
-                        )
-
-                    except Exception as e:
-                        analysis_progress.update(task, description="[red]❌ Analysis failed")
-                        analysis_progress.stop()
-
-                        console.print(
-                            Panel(
-                                f"[bold red]❌ Analysis Failed[/bold red]\n\n"
-                                f"Error: {e!s}\n\n"
-                                f"[dim]This might be due to:[/dim]\n"
-                                f"• ClearML configuration issues\n"
-                                f"• Invalid experiment ID\n"
-                                f"• Network connectivity problems\n"
-                                f"• API rate limits",
-                                border_style="red",
-                                padding=(1, 2),
-                            )
-                        )
-
-                console.print()
+QUESTION_PROMPT = "🗣️  Your question: "
 
-        console.print(
-            Panel.fit(
-                "[bold green]🎉 All analyses completed successfully![/bold green]",
-                border_style="green",
-            )
-        )
+
+def _prompt_session():
+    """Return a prompt_toolkit session for terminal input, or None to use console.input."""
+    if not sys.stdin.isatty():
+        return None
+    try:
+        from prompt_toolkit import PromptSession
+    except ImportError:
+        return None
+    return PromptSession()
+
+
+async def read_question(prompt_session):
+    """Read the next question without blocking the event loop; None at end of input."""
+    if prompt_session is not None:
+        try:
+            # Leave SIGINT to asyncio, which turns Ctrl+C during a run into cancellation
+            return await prompt_session.prompt_async(QUESTION_PROMPT, handle_sigint=False)
+        except EOFError:
+            return None
+
+    def read():
+        try:
+            return console.input(f"\n[bold blue]{QUESTION_PROMPT}[/bold blue]")
+        except EOFError:
+            return None
+
+    return await in_daemon_thread(read)
 
 
-def interactive_mode():
-    """Run the agent in interactive mode for custom queries with rich interface."""
+async def interactive_mode(agent, client=None):
+    """Run the agent in interactive mode for custom queries with rich interface.
+
+    Input is read asynchronously (with prompt_toolkit when it is installed) and the
+    agent runs in a worker thread, so the event loop stays free while it streams.
+    With the MCP ``client``, connections are warmed up while the first question is typed.
+    """
+    warmup = start_warm_up(client) if client is not None else None
+
     console.print(
         Panel(
             "[bold blue]🤖 Interactive ClearML Analysis Mode[/bold blue]\n\n"
@@ -211,72 +484,89 @@ def interactive_mode():
         )
     )
 
-    # Create the model and server parameters
-    model, clearml_server_params = create_clearml_analysis_agent()
-
-    with MCPClient(clearml_server_params) as clearml_tools:
-        agent = CodeAgent(
-            tools=clearml_tools,
-            model=model,
-            add_base_tools=False,
-            verbosity_level=1,
-        )
-
-        console.print("[green]✅ Agent ready for your questions![/green]\n")
-
-        while True:
-            try:
-                user_query = console.input("\n[bold blue]🗣️  Your question:[/bold blue] ").strip()
-
-                if user_query.lower() in ["quit", "exit", "q", "bye"]:
-                    console.print("[yellow]👋 Goodbye![/yellow]")
-                    break
-
-                if not user_query:
-                    continue
-
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    console=console,
-                ) as progress:
-                    task = progress.add_task("[yellow]🤔 Analyzing your question...", total=None)
-
-                    try:
-                        result = agent.run(user_query)
-                        progress.update(task, description="[green]✅ Analysis complete!")
-                        progress.stop()
-
-                        console.print(
-                            Panel(
-                                f"[bold green]💡 Answer[/bold green]\n\n{result}",
-                                border_style="green",
-                                padding=(1, 2),
-                            )
-                        )
-
-                    except Exception as e:
-                        progress.update(task, description="[red]❌ Analysis failed")
-                        progress.stop()
-
-                        console.print(
-                            Panel(
-                                f"[bold red]❌ Error[/bold red]\n\n{e!s}",
-                                border_style="red",
-                                padding=(1, 2),
-                            )
-                        )
-
-            except KeyboardInterrupt:
-                console.print("\n\n[yellow]👋 Interrupted by user[/yellow]")
-                break
-            except EOFError:
-                console.print("\n\n[yellow]👋 Goodbye![/yellow]")
-                break
+    console.print("[green]✅ Agent ready for your questions![/green]\n")
+
+    stream_run = _load_analysis_deps().stream_run
+    prompt_session = _prompt_session()
+    # One live region, shown only while the agent works: a spinner until the first
+    # token, then the model output as it streams in. It is stopped while prompting
+    # so it never redraws over the input line.
+    live = Live(console=console, refresh_per_second=8, transient=True)
+    while True:
+        try:
+            user_query = await read_question(prompt_session)
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            console.print("\n\n[yellow]👋 Interrupted by user[/yellow]")
+            break
+
+        if user_query is None:
+            console.print("\n\n[yellow]👋 Goodbye![/yellow]")
+            break
+
+        user_query = user_query.strip()
+        if user_query.lower() in ["quit", "exit", "q", "bye"]:
+            console.print("[yellow]👋 Goodbye![/yellow]")
+            break
+
+        if not user_query:
+            continue
+
+        if warmup is not None:
+            await finish_warm_up(warmup)
+            warmup = None
+
+        stop = threading.Event()
+        live.update(Spinner("dots", text="[yellow]🤔 Analyzing your question..."))
+        try:
+            with live:
+                result = await asyncio.to_thread(stream_run, agent, user_query, live, stop=stop)
+        except asyncio.CancelledError:
+            # Ctrl+C while the agent runs: stop streaming and leave the session
+            stop.set()
+            console.print("\n\n[yellow]👋 Interrupted by user[/yellow]")
+            break
+        except Exception as e:
+            console.print(
+                Panel(
+                    f"[bold red]❌ Error[/bold red]\n\n{e!s}",
+                    border_style="red",
+                    padding=(1, 2),
+                )
+            )
+        else:
+            console.print(
+                Panel(
+                    f"[bold green]💡 Answer[/bold green]\n\n{result}",
+                    border_style="green",
+                    padding=(1, 2),
+                )
+            )
 
 
 def main():
     """Main function with enhanced UI and options for demo or interactive mode."""
+    parser = argparse.ArgumentParser(description="ClearML analysis agent (Gemini + MCP)")
+    parser.add_argument(
+        "--exp-id",
+        nargs="+",
+        metavar="ID",
+        help=f"Experiment IDs to analyze (default: {EXPERIMENT_ID})",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["demo", "interactive"],
+        help="Skip the mode prompt and run this mode directly",
+    )
+    parser.add_argument(
+        "--granular",
+        action="store_true",
+        help="Run the experiment analyses as separate queries instead of one batched report",
+    )
+    args = parser.parse_args()
+    exp_ids = args.exp_id or [EXPERIMENT_ID]
+
+    load_environment()
+
     console.print(
         Panel.fit(
             "[bold blue]🔬 ClearML Analysis Agent[/bold blue]\n"
@@ -287,30 +577,37 @@ def main():
 
     console.print("\n[bold]Prerequisites Check:[/bold]")
     console.print("✅ ClearML configured with ~/.clearml.conf")
-    console.print("✅ clearml-mcp server available (uvx clearml-mcp)")
+    console.print("✅ clearml-mcp server available (clearml-mcp on PATH, or uvx)")
     console.print("✅ smolagents with OpenAI/MCP support installed")
     console.print("✅ Google Gemini API key configured")
     console.print()
 
     # Check if user wants demo or interactive mode
-    try:
-        mode = (
-            console.input(
-                "[bold]Choose mode - [cyan][d][/cyan]emo or [cyan][i][/cyan]nteractive (default: demo): "
+    mode = args.mode or ""
+    if not mode:
+        try:
+            mode = (
+                console.input(
+                    "[bold]Choose mode - [cyan][d][/cyan]emo or [cyan][i][/cyan]nteractive (default: demo): "
+                )
+                .strip()
+                .lower()
             )
-            .strip()
-            .lower()
-        )
-    except (EOFError, KeyboardInterrupt):
-        # Default to demo mode when run non-interactively
-        mode = "d"
-        console.print("[dim]Running in demo mode (non-interactive execution)[/dim]")
+        except (EOFError, KeyboardInterrupt):
+            # Default to demo mode when run non-interactively
+            mode = "d"
+            console.print("[dim]Running in demo mode (non-interactive execution)[/dim]")
 
     try:
-        if mode.startswith("i"):
-            interactive_mode()
-        else:
-            demonstrate_clearml_analysis()
+        with mcp_session() as (agent, clearml_tools, client):
+            if mode.startswith("i"):
+                asyncio.run(interactive_mode(agent, client))
+            else:
+                asyncio.run(
+                    demonstrate_clearml_analysis(
+                        clearml_tools, exp_ids, granular=args.granular, client=client
+                    )
+                )
 
     except KeyboardInterrupt:
         console.print("\n[yellow]👋 Agent stopped by user[/yellow]")
@@ -6,28 +6,12 @@ This script helps find actual experiment IDs in your ClearML instance
 so we can debug real experiments instead of fake ones.
 """
 
-import os
-
-from mcp import StdioServerParameters
-
-# Load environment variables from .env file
-try:
-    from dotenv import load_dotenv
-
-    load_dotenv()
-except ImportError:
-    print("dotenv package not found, skipping.")
-
-# Set up Gemini API key
-GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY environment variable not set")
-
 try:
+    import agent_setup
     from rich.console import Console
     from rich.panel import Panel
     from rich.table import Table
-    from smolagents import CodeAgent, MCPClient, OpenAIServerModel
+    from smolagents import CodeAgent, MCPClient
 except ImportError:
     print("❌ Required packages not found. Install with: uv sync --group examples")
     raise
@@ -45,20 +29,9 @@ def find_experiments():
         )
     )
 
-    # Initialize Gemini model
-    model = OpenAIServerModel(
-        model_id="gemini-2.0-flash",
-        api_base="https://generativelanguage.googleapis.com/v1beta/openai/",
-        api_key=GEMINI_API_KEY,
-        temperature=0.1,
-    )
-
-    # Configure ClearML MCP server
-    clearml_server_params = StdioServerParameters(
-        command="python",
-        args=["-m", "clearml_mcp.clearml_mcp"],
-        env=os.environ,
-    )
+    # Key lookup (environment or keyring) happens here, not at import
+    model = agent_setup.create_gemini_model()
+    clearml_server_params = agent_setup.clearml_server_params()
 
     with MCPClient(clearml_server_params) as clearml_tools:
         agent = CodeAgent(
@@ -94,5 +67,17 @@ def find_experiments():
             console.print(f"[red]❌ Search failed: {e!s}[/red]")
 
 
-if __name__ == "__main__":
+def main():
+    """Load environment variables from .env file, then run."""
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+    except ImportError:
+        print("dotenv package not found, skipping.")
+
     find_experiments()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,122 +6,243 @@ Show scalar convergence analysis without long searches.
 Focus on analyzing realistic training patterns and convergence.
 """
 
-import os
-
-from mcp import StdioServerParameters
-
-# Load environment variables from .env file
-try:
-    from dotenv import load_dotenv
+import argparse
+import contextlib
+import functools
+import sys
+import time
+from types import SimpleNamespace
+
+INSTALL_HINT = "❌ Required packages not found. Install with: uv sync --group examples"
+
+
+@functools.lru_cache(maxsize=1)
+def _get_console():
+    """The shared Rich console, created (and Rich imported) on first use."""
+    try:
+        from rich.console import Console
+    except ImportError:
+        raise SystemExit(INSTALL_HINT) from None
+    return Console()
+
+
+@functools.lru_cache(maxsize=1)
+def _load_demo_deps():
+    """Import the agent stack on first use instead of at module import."""
+    try:
+        import agent_setup
+        import persistent_server
+        from rich.live import Live
+        from rich.panel import Panel
+        from smolagents import MCPClient
+        from streaming import quiet_logger, stream_run
+    except ImportError:
+        raise SystemExit(INSTALL_HINT) from None
+
+    return SimpleNamespace(
+        agent_setup=agent_setup,
+        persistent_server=persistent_server,
+        Live=Live,
+        Panel=Panel,
+        CodeAgent=agent_setup.SharedPromptCodeAgent,
+        MCPClient=MCPClient,
+        quiet_logger=quiet_logger,
+        stream_run=stream_run,
+    )
 
-    load_dotenv()
-except ImportError:
-    print("dotenv package not found, skipping.")
 
-# Set up Gemini API key
-GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY environment variable not set")
+# The invariant instructions come first and the scenario data last: providers cache
+# prompts by prefix, so every run shares the longest possible cached prefix and only
+# the scenario tail is prefilled from scratch.
+ANALYSIS_INSTRUCTIONS = """As an ML debugging expert, analyze the training scenario below.
 
-try:
-    from rich.console import Console
-    from rich.panel import Panel
-    from smolagents import CodeAgent, MCPClient, OpenAIServerModel
-except ImportError:
-    print("❌ Required packages not found. Install with: uv sync --group examples")
-    raise
+CONVERGENCE ANALYSIS:
+1. Calculate the convergence rate from the loss values
+2. Identify if this shows good, concerning, or poor convergence
+3. Check for overfitting signs in train vs validation metrics
+4. Assess if the learning rate is appropriate
+5. Determine optimal stopping point
+6. Provide specific recommendations based on the scalar trends
 
-console = Console()
+Focus on the numerical evidence and trends in the data.
+"""
 
+# The analysis query is ANALYSIS_INSTRUCTIONS + SCENARIO_DATA
+SCENARIO_DATA = """
+EXPERIMENT SCALARS:
+Training Loss: [2.3, 1.8, 1.4, 1.1, 0.9, 0.8, 0.7, 0.65, 0.62, 0.60]
+Validation Loss: [2.4, 1.9, 1.5, 1.2, 1.0, 0.85, 0.75, 0.72, 0.70, 0.68]
+Training Accuracy: [0.2, 0.35, 0.48, 0.58, 0.66, 0.72, 0.77, 0.81, 0.83, 0.85]
+Validation Accuracy: [0.18, 0.32, 0.45, 0.55, 0.63, 0.69, 0.74, 0.78, 0.80, 0.82]
+Learning Rate: [0.001] * 10 (fixed)
+Epochs: 10
+"""
 
-def quick_scalar_analysis():
-    """Quick demonstration of scalar pattern analysis."""
-    console.print(
-        Panel.fit(
+# Shown instead of the analysis when Gemini rate-limits the request
+FALLBACK_ANALYSIS = (
+    "[bold]Convergence Assessment: GOOD[/bold]\n"
+    "• Training loss: Smooth decrease (2.3 → 0.60)\n"
+    "• Validation loss: Following training (2.4 → 0.68)\n"
+    "• Small gap: 0.60 vs 0.68 (healthy)\n"
+    "• Convergence rate: ~74% improvement\n"
+    "• Learning rate: 0.001 appears optimal\n"
+    "• Recommendation: Continue 2-3 more epochs"
+)
+
+
+def render(renderable):
+    """Lay out a renderable once and return the text, styled only when writing to a terminal."""
+    console = _get_console()
+    with console.capture() as capture:
+        console.print(renderable)
+    return capture.get()
+
+
+@functools.lru_cache(maxsize=1)
+def banner():
+    """The intro banner, laid out once per process."""
+    return render(
+        _load_demo_deps().Panel.fit(
             "[bold blue]📊 Quick Scalar Convergence Analysis[/bold blue]\n"
             "[dim]Analyzing training patterns for convergence debugging[/dim]",
             border_style="blue",
         )
     )
 
-    model = OpenAIServerModel(
-        model_id="gemini-2.0-flash",
-        api_base="https://generativelanguage.googleapis.com/v1beta/openai/",
-        api_key=GEMINI_API_KEY,
-        temperature=0.1,
-    )
 
-    clearml_server_params = StdioServerParameters(
-        command="python",
-        args=["-m", "clearml_mcp.clearml_mcp"],
-        env=os.environ,
-    )
+def analyze(clearml_tools, model, live=None):
+    """Analyze the scenario and return the outcome.
 
-    # Quick scalar analysis scenario
-    analysis_query = """
-    Analyze this training scenario with specific scalar data:
-
-    EXPERIMENT SCALARS:
-    Training Loss: [2.3, 1.8, 1.4, 1.1, 0.9, 0.8, 0.7, 0.65, 0.62, 0.60]
-    Validation Loss: [2.4, 1.9, 1.5, 1.2, 1.0, 0.85, 0.75, 0.72, 0.70, 0.68]
-    Training Accuracy: [0.2, 0.35, 0.48, 0.58, 0.66, 0.72, 0.77, 0.81, 0.83, 0.85]
-    Validation Accuracy: [0.18, 0.32, 0.45, 0.55, 0.63, 0.69, 0.74, 0.78, 0.80, 0.82]
-    Learning Rate: [0.001] * 10 (fixed)
-    Epochs: 10
-
-    CONVERGENCE ANALYSIS:
-    1. Calculate the convergence rate from the loss values
-    2. Identify if this shows good, concerning, or poor convergence
-    3. Check for overfitting signs in train vs validation metrics
-    4. Assess if the learning rate is appropriate
-    5. Determine optimal stopping point
-    6. Provide specific recommendations based on the scalar trends
-
-    Focus on the numerical evidence and trends in the data.
+    The outcome is the answer and the run's (prompt, cached) token counts, or the
+    exception the run failed with. With a Rich `Live`, model output is streamed into
+    it as it is generated; without one (e.g. output piped to a file) the analysis
+    runs as a blocking call.
     """
-
-    with MCPClient(clearml_server_params) as clearml_tools:
-        agent = CodeAgent(
-            tools=clearml_tools,
-            model=model,
-            add_base_tools=False,
-            verbosity_level=0,
-            max_steps=1,  # Just one analysis step
-        )
-
-        console.print("\n[yellow]📈 Analyzing scalar convergence patterns...[/yellow]")
-
-        try:
-            result = agent.run(analysis_query)
-
+    deps = _load_demo_deps()
+    streaming = {"stream_outputs": True, "logger": deps.quiet_logger()} if live else {}
+    agent = deps.CodeAgent(
+        tools=clearml_tools,
+        model=model,
+        add_base_tools=False,
+        verbosity_level=0,
+        max_steps=1,  # Just one analysis step
+        **streaming,
+    )
+    query = ANALYSIS_INSTRUCTIONS + SCENARIO_DATA
+    try:
+        result = agent.run(query) if live is None else deps.stream_run(agent, query, live)
+    except Exception as e:
+        return e
+    return result, deps.agent_setup.prompt_token_usage(agent, streamed=live is not None)
+
+
+def show_outcome(outcome):
+    """Print the analysis, rate-limit fallback or error."""
+    deps = _load_demo_deps()
+    console = _get_console()
+
+    if not isinstance(outcome, Exception):
+        result, (prompt_tokens, cached_tokens) = outcome
+        if console.is_terminal:
             console.print(
-                Panel(
+                deps.Panel(
                     f"[bold green]📊 Scalar Convergence Analysis[/bold green]\n\n{result}",
                     border_style="green",
                     padding=(1, 2),
                 )
             )
+        else:
+            # Piped output (CI logs): skip markup parsing and panel layout
+            print(f"📊 Scalar Convergence Analysis\n\n{result}")
+        if prompt_tokens:
+            cache_note = (
+                "cache hits not reported when streaming"
+                if cached_tokens is None
+                else f"{cached_tokens:,} served from cache"
+            )
+            console.print(f"[dim]Prompt tokens: {prompt_tokens:,} ({cache_note})[/dim]")
+    elif "429" in str(outcome):
+        console.print(
+            deps.Panel(
+                "[bold yellow]⏳ Rate Limited[/bold yellow]\n\n"
+                f"Analysis would show:\n\n{FALLBACK_ANALYSIS}",
+                border_style="yellow",
+                padding=(1, 2),
+            )
+        )
+    else:
+        console.print(f"[red]❌ Analysis failed: {outcome!s}[/red]")
 
-        except Exception as e:
-            if "429" in str(e):
-                console.print(
-                    Panel(
-                        "[bold yellow]⏳ Rate Limited[/bold yellow]\n\n"
-                        "Analysis would show:\n\n"
-                        "[bold]Convergence Assessment: GOOD[/bold]\n"
-                        "• Training loss: Smooth decrease (2.3 → 0.60)\n"
-                        "• Validation loss: Following training (2.4 → 0.68)\n"
-                        "• Small gap: 0.60 vs 0.68 (healthy)\n"
-                        "• Convergence rate: ~74% improvement\n"
-                        "• Learning rate: 0.001 appears optimal\n"
-                        "• Recommendation: Continue 2-3 more epochs",
-                        border_style="yellow",
-                        padding=(1, 2),
-                    )
-                )
-            else:
-                console.print(f"[red]❌ Analysis failed: {e!s}[/red]")
+
+def quick_scalar_analysis(*, persistent=False):
+    """Quick demonstration of scalar pattern analysis.
+
+    On a terminal the output streams into a live view while it is generated. With
+    ``persistent`` the ClearML MCP server is left running in the background and
+    reused by later runs.
+    """
+    deps = _load_demo_deps()
+    console = _get_console()
+
+    sys.stdout.write(banner())
+
+    # Key lookup (environment or keyring) happens here, not at import
+    model = deps.agent_setup.create_gemini_model()
+    if persistent:
+        clearml_server_params = deps.persistent_server.ensure_server()
+    else:
+        clearml_server_params = deps.agent_setup.clearml_server_params()
+
+    # Stream into a live view on terminals; piped output only gets the final results
+    live = (
+        deps.Live(console=console, refresh_per_second=8, transient=True)
+        if console.is_terminal
+        else None
+    )
+    with (
+        deps.MCPClient(clearml_server_params) as clearml_tools,
+        live or contextlib.nullcontext(),
+    ):
+        console.print("\n[yellow]📈 Analyzing scalar convergence patterns...[/yellow]")
+
+        outcome = analyze(clearml_tools, model, live)
+    # Printed once the live view is gone, so it doesn't redraw over the result
+    show_outcome(outcome)
+
+
+def main():
+    """Load environment variables from .env file, then run."""
+    parser = argparse.ArgumentParser(description="Quick scalar convergence analysis demo")
+    parser.add_argument(
+        "--persistent",
+        action="store_true",
+        help="keep the ClearML MCP server running in the background and reuse it on later runs",
+    )
+    parser.add_argument(
+        "--stop",
+        action="store_true",
+        help="stop the background server started by --persistent and exit",
+    )
+    args = parser.parse_args()
+
+    if args.stop:
+        stopped = _load_demo_deps().persistent_server.stop_server()
+        _get_console().print(
+            "[green]Stopped the background ClearML MCP server[/green]"
+            if stopped
+            else "[yellow]No background ClearML MCP server was running[/yellow]"
+        )
+        return
+
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+    except ImportError:
+        print("dotenv package not found, skipping.")
+
+    quick_scalar_analysis(persistent=args.persistent)
 
 
 if __name__ == "__main__":
-    quick_scalar_analysis()
+    main()
@@ -0,0 +1,329 @@
+"""
+Shared agent construction for the ClearML MCP examples.
+
+`PrefetchingCodeAgent` spots experiment IDs in the task, fetches their basic
+info, metrics and parameters up front (through the cached MCP tools, so repeat
+runs are free) and hands them to the agent as variables. With the data already
+in context most analyses finish in a few steps, so the agent starts with a small
+step budget and only continues up to a larger one if it runs out.
+
+The model and MCP server factories are shared by the examples and memoized, so
+every agent in a process reuses one model (and its HTTP connection pool), and
+`SharedPromptCodeAgent` renders the system prompt once for all of them.
+"""
+
+import contextlib
+import functools
+import importlib.util
+import os
+import re
+import shutil
+import sys
+import time
+from typing import ClassVar
+
+from mcp import StdioServerParameters
+from smolagents import AgentMaxStepsError, CodeAgent, OpenAIServerModel
+from smolagents.memory import ActionStep
+from smolagents.models import ChatMessage, MessageRole
+from smolagents.monitoring import Timing
+from tool_cache import is_error_result
+
+# ClearML task IDs are 32 hex characters (optionally shown with an "e-" prefix)
+EXPERIMENT_ID_PATTERN = re.compile(r"\b[0-9a-f]{32}\b")
+PREFETCH_TOOLS = ("get_task_info", "get_task_metrics", "get_task_parameters")
+
+# Added to the task only when prefetching found data, so the agent skips those calls
+PREFETCH_NOTE = (
+    "\n\nThese tool results are already loaded as variables: {names}. "
+    "Use them instead of calling those tools again."
+)
+
+INITIAL_MAX_STEPS = 5
+FALLBACK_MAX_STEPS = 15  # Total, including the initial steps
+
+# Task for continuing a run that used up its initial step budget. It repeats the
+# original task because smolagents' final-answer fallback only looks at the current one.
+CONTINUE_TASK = "You ran out of steps. Continue with {steps} more steps on this task:\n\n{task}"
+
+# Installed server entry point, resolved once so each spawn skips any PATH or uv lookup
+CLEARML_MCP_BIN = shutil.which("clearml-mcp")
+
+# Variables passed on to the MCP server. The MCP client already supplies the basics
+# (PATH, HOME, USER, ...); on top of those the server only needs its ClearML
+# configuration, network settings for reaching the ClearML API, and uv's settings
+# for the uvx fallback.
+SERVER_ENV_PREFIXES = ("CLEARML_", "TRAINS_", "UV_")
+SERVER_ENV_VARS = frozenset(
+    (
+        "PYTHONPATH",
+        "HTTP_PROXY",
+        "HTTPS_PROXY",
+        "NO_PROXY",
+        "http_proxy",
+        "https_proxy",
+        "no_proxy",
+        "REQUESTS_CA_BUNDLE",
+        "SSL_CERT_FILE",
+        "SSL_CERT_DIR",
+    )
+)
+
+# Google Gemini OpenAI-compatible API base URL
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta/openai/"
+
+# Where `get_gemini_api_key` looks in the system keyring, e.g. after
+# `keyring set clearml-mcp gemini`
+KEYRING_SERVICE = "clearml-mcp"
+KEYRING_USERNAME = "gemini"
+
+
+def get_gemini_api_key():
+    """Return the Gemini API key from the environment or the system keyring, if any.
+
+    ``GEMINI_API_KEY`` (or ``GOOGLE_API_KEY``) wins; the keyring is only consulted
+    when neither is set and the optional ``keyring`` package is installed.
+    """
+    api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
+    if api_key:
+        return api_key
+
+    try:
+        import keyring
+        from keyring.errors import KeyringError
+    except ImportError:
+        return None
+
+    try:
+        return keyring.get_password(KEYRING_SERVICE, KEYRING_USERNAME)
+    except KeyringError:
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def create_gemini_model(model_id="gemini-2.0-flash", temperature=0.1):
+    """Create the Gemini model via the OpenAI-compatible API, once per process."""
+    gemini_api_key = get_gemini_api_key()
+    if not gemini_api_key:
+        raise RuntimeError(
+            "Gemini API key not found. Set GEMINI_API_KEY or store it with "
+            f"`keyring set {KEYRING_SERVICE} {KEYRING_USERNAME}`"
+        )
+
+    return OpenAIServerModel(
+        model_id=model_id,
+        api_base=GEMINI_API_BASE,
+        api_key=gemini_api_key,
+        temperature=temperature,  # Lower temperature for more focused analysis
+    )
+
+
+def warm_up_model(model):
+    """Send a one-token request so the model's HTTP connection is open before real queries."""
+    model.generate(
+        [ChatMessage(role=MessageRole.USER, content=[{"type": "text", "text": "ok"}])],
+        max_tokens=1,
+    )
+
+
+def prompt_token_usage(agent, *, streamed=False):
+    """Return (prompt tokens, cached prompt tokens) for the agent's last run.
+
+    Counts come from the API's usage report; providers that don't report cache hits
+    (or don't cache) show zero cached tokens. smolagents rebuilds streamed steps
+    without the report, keeping only its token totals, so for a ``streamed`` run the
+    cached count is None (unknown). Steps without a report in a blocking run, such
+    as the forced final answer at the step limit, count towards prompt tokens only.
+    """
+    prompt_tokens = 0
+    cached_tokens = 0
+    for step in agent.memory.steps:
+        message = getattr(step, "model_output_message", None)
+        usage = getattr(getattr(message, "raw", None), "usage", None)
+        if usage is not None:
+            prompt_tokens += getattr(usage, "prompt_tokens", None) or 0
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached_tokens += getattr(details, "cached_tokens", None) or 0
+        elif getattr(step, "token_usage", None) is not None:
+            prompt_tokens += step.token_usage.input_tokens
+    return prompt_tokens, None if streamed else cached_tokens
+
+
+def server_command():
+    """Pick the cheapest way to start the ClearML MCP server.
+
+    Prefers the installed ``clearml-mcp`` script, then the package in this
+    interpreter (e.g. a source checkout), and only falls back to ``uvx``, which
+    resolves the package on every launch.
+    """
+    if CLEARML_MCP_BIN:
+        return CLEARML_MCP_BIN, []
+    if importlib.util.find_spec("clearml_mcp") is not None:
+        return sys.executable, ["-m", "clearml_mcp.clearml_mcp"]
+    return "uvx", ["clearml-mcp"]
+
+
+def server_environment():
+    """The subset of ``os.environ`` the ClearML MCP server needs.
+
+    Keeps API keys and other unrelated variables out of the server process.
+    """
+    return {
+        key: value
+        for key, value in os.environ.items()
+        if key in SERVER_ENV_VARS or key.startswith(SERVER_ENV_PREFIXES)
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def clearml_server_params():
+    """Parameters for spawning the ClearML MCP server over stdio.
+
+    The environment is snapshotted on the first call; later changes to
+    ``os.environ`` are not passed to the server.
+    """
+    command, args = server_command()
+    return StdioServerParameters(command=command, args=args, env=server_environment())
+
+
+class SharedPromptCodeAgent(CodeAgent):
+    """CodeAgent that renders its system prompt once per configuration.
+
+    smolagents re-renders the system prompt template whenever the prompt is read: at
+    construction and again at the start of every run. The examples build a fresh agent
+    per query over the same tools, so the rendered text is shared between agents with
+    the same template, tools and options. Every run then also sends a byte-identical
+    prompt prefix, which is what provider-side prompt caching keys on.
+    """
+
+    _rendered_prompts: ClassVar[dict] = {}
+
+    def initialize_system_prompt(self):
+        """Return the rendered system prompt, rendering it only for a new configuration."""
+        key = (
+            type(self),
+            self.prompt_templates["system_prompt"],
+            tuple(self.tools),
+            tuple(self.managed_agents),
+            tuple(sorted(self.authorized_imports)),
+            self.instructions,
+            tuple(self.code_block_tags),
+        )
+        prompt = self._rendered_prompts.get(key)
+        if prompt is None:
+            prompt = self._rendered_prompts[key] = super().initialize_system_prompt()
+        return prompt
+
+
+class PrefetchingCodeAgent(SharedPromptCodeAgent):
+    """CodeAgent that preloads referenced experiments and grows its step budget on demand."""
+
+    def __init__(
+        self,
+        *args: object,
+        max_steps=INITIAL_MAX_STEPS,
+        fallback_max_steps=FALLBACK_MAX_STEPS,
+        **kwargs: object,
+    ):
+        super().__init__(*args, max_steps=max_steps, **kwargs)
+        self.fallback_max_steps = fallback_max_steps
+        self._continuing = False
+
+    def prefetch(self, task):
+        """Call the basic experiment tools once for every experiment ID mentioned in task."""
+        context = {}
+        for task_id in dict.fromkeys(EXPERIMENT_ID_PATTERN.findall(task)):
+            for tool_name in PREFETCH_TOOLS:
+                tool = self.tools.get(tool_name)
+                if tool is None:
+                    continue
+                # On failure the agent can still call the tool itself
+                with contextlib.suppress(Exception):
+                    result = tool(task_id=task_id)
+                    if not is_error_result(result):
+                        context[f"{tool_name}_{task_id}"] = result
+        return context
+
+    def _hit_step_limit(self):
+        steps = self.memory.steps
+        return bool(steps) and isinstance(getattr(steps[-1], "error", None), AgentMaxStepsError)
+
+    def _handle_max_steps_reached(self, task, images):
+        if not self._continuing:
+            return super()._handle_max_steps_reached(task, images)
+        # The run continues with more steps, so skip smolagents' forced final answer
+        now = time.time()
+        step = ActionStep(
+            step_number=self.step_number,
+            error=AgentMaxStepsError("Reached max steps.", self.logger),
+            timing=Timing(start_time=now, end_time=now),
+        )
+        self._finalize_step(step)
+        self.memory.steps.append(step)
+        return None
+
+    def run(
+        self,
+        task,
+        *,
+        stream=False,
+        additional_args=None,
+        max_steps=None,
+        prefetch=True,
+        **kwargs: object,
+    ):
+        """Run with prefetched experiment data, continuing with more steps if needed.
+
+        Without an explicit ``max_steps``, a run that uses up its initial budget keeps
+        its memory and continues for the rest of ``fallback_max_steps``, so it never
+        takes more steps than that in total; a streamed run yields the continuation's
+        events after the first ones. Pass ``prefetch=False`` for tasks that mention
+        experiment IDs without being about them.
+        """
+        prefetched = self.prefetch(task) if prefetch else {}
+        if prefetched:
+            task += PREFETCH_NOTE.format(names=", ".join(prefetched))
+            additional_args = {**prefetched, **(additional_args or {})}
+
+        extra_steps = self.fallback_max_steps - self.max_steps if max_steps is None else 0
+        if extra_steps <= 0:
+            return super().run(
+                task,
+                stream=stream,
+                additional_args=additional_args,
+                max_steps=max_steps,
+                **kwargs,
+            )
+
+        if stream:
+            return self._stream_with_continuation(task, extra_steps, additional_args, kwargs)
+
+        self._continuing = True
+        try:
+            result = super().run(task, additional_args=additional_args, **kwargs)
+        finally:
+            self._continuing = False
+        if not self._hit_step_limit():
+            return result
+        return super().run(**self._continuation(task, extra_steps, kwargs))
+
+    def _continuation(self, task, extra_steps, kwargs):
+        """Arguments for continuing the last run with extra_steps more steps.
+
+        The prefetched variables are still in the agent's state, so they aren't passed again.
+        """
+        return {
+            **kwargs,
+            "task": CONTINUE_TASK.format(steps=extra_steps, task=task),
+            "reset": False,
+            "max_steps": extra_steps,
+        }
+
+    def _stream_with_continuation(self, task, extra_steps, additional_args, kwargs):
+        self._continuing = True
+        try:
+            yield from super().run(task, stream=True, additional_args=additional_args, **kwargs)
+        finally:
+            self._continuing = False
+        if self._hit_step_limit():
+            yield from super().run(stream=True, **self._continuation(task, extra_steps, kwargs))
@@ -4,49 +4,101 @@ ClearML MCP Demo Script
 Demonstrates real-time analysis of ClearML experiment data using MCP tools.
 """
 
+import argparse
+import asyncio
+import functools
 import os
 import time
+from types import SimpleNamespace
 
-from mcp import StdioServerParameters
 from rich.console import Console
+from rich.live import Live
 from rich.panel import Panel
-from smolagents import CodeAgent, MCPClient, OpenAIServerModel
+from rich.table import Table
+from rich.text import Text
 
 console = Console()
 
+# Experiments analyzed at once in batch mode; bounds concurrent Gemini requests
+MAX_CONCURRENT_ANALYSES = 5
 
-# Load environment variables from .env file
-try:
-    from dotenv import load_dotenv
+TARGET_EXPERIMENT_NAME = "PyTorch with TensorBoard"
+FALLBACK_EXPERIMENT_ID = "e-efe5f7a6c5f34a15b4bfbf1c33660e20"
 
-    load_dotenv()
-except ImportError:
-    print("dotenv package not found, skipping.")
+# Prompts are module constants: the discovery query never changes, and the analysis
+# template is filled per experiment with a single str.format call.
+DISCOVERY_QUERY = f"""Discover and validate a ClearML experiment for analysis:
 
-# Set up Gemini API key
-GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY environment variable not set")
+TARGET: Find a PyTorch experiment with TensorBoard logging in ClearML examples
+
+DISCOVERY STRATEGY:
+1. Use find_project_by_pattern with pattern "Pytorch" to find PyTorch-related projects
+2. Look for projects that contain "Frameworks" and "Pytorch" in the name
+3. Once you find the right project, use find_experiment_in_project with pattern "TensorBoard"
+4. Find the experiment named "{TARGET_EXPERIMENT_NAME}"
+5. Get the experiment ID, status, and verify it has scalar metrics
+6. If dynamic discovery fails, fall back to known experiment ID: {FALLBACK_EXPERIMENT_ID}
+
+TOOLS TO USE:
+- find_project_by_pattern(pattern="Pytorch")
+- find_experiment_in_project(project_name=<found_project>, experiment_pattern="TensorBoard")
+- get_task_info(task_id=<found_experiment_id>) to validate
+
+IMPORTANT: Start your response with "EXPERIMENT_ID: [the actual ID]" followed by your discovery process and validation."""
+
+ANALYSIS_QUERY = """Analyze this ClearML experiment's scalar convergence patterns:
+
+EXPERIMENT ID: {exp}
+
+DETAILED ANALYSIS TASKS:
+1. Use ClearML MCP tools to retrieve all scalar metrics from this experiment
+2. Extract training and validation metrics (loss, accuracy, etc.)
+3. Calculate convergence rates from the retrieved values
+4. Identify convergence quality (good/concerning/poor)
+5. Check for overfitting signs in training vs validation metrics
+6. Assess learning rate appropriateness based on convergence patterns
+7. Determine optimal stopping point from the data
+8. Provide specific, actionable recommendations
+
+Focus on numerical evidence and actionable insights from the REAL experiment data.
+Show your work with calculations and specific metric values."""
+
+
+@functools.lru_cache(maxsize=1)
+def _load_demo_deps():
+    """Import the agent stack on first use instead of at module import."""
+    from agent_setup import PrefetchingCodeAgent, clearml_server_params, create_gemini_model
+    from streaming import quiet_logger, stream_run
+    from tool_cache import LazyMCPClient, cached_tools
+
+    return SimpleNamespace(
+        CodeAgent=PrefetchingCodeAgent,
+        LazyMCPClient=LazyMCPClient,
+        create_gemini_model=create_gemini_model,
+        clearml_server_params=clearml_server_params,
+        cached_tools=cached_tools,
+        quiet_logger=quiet_logger,
+        stream_run=stream_run,
+    )
 
 
 class ClearMLDemo:
     """Demo class for ClearML MCP integration."""
 
     def __init__(self):
-        """Initialize the demo with OpenAI client and ClearML MCP connection."""
-        self.model = OpenAIServerModel(
-            model_id="gemini-2.0-flash",
-            api_base="https://generativelanguage.googleapis.com/v1beta/openai/",
-            api_key=GEMINI_API_KEY,
-            temperature=0.1,
-        )
-        self.clearml_server_params = StdioServerParameters(
-            command="python",
-            args=["-m", "clearml_mcp.clearml_mcp"],
-            env=os.environ,
-        )
+        """Initialize the demo; the model and MCP server are set up lazily on first use."""
         self.experiment_id = None
 
+    @property
+    def model(self):
+        """Gemini model via the OpenAI-compatible API (shared, created on first use)."""
+        return _load_demo_deps().create_gemini_model()
+
+    @property
+    def clearml_server_params(self):
+        """Parameters for spawning the ClearML MCP server over stdio."""
+        return _load_demo_deps().clearml_server_params()
+
     def run_demo(self):
         """Run the complete demo workflow."""
         # Show demo introduction
@@ -59,11 +111,23 @@ class ClearMLDemo:
         )
         console.print()
 
-        # Step 1: Find the experiment
-        self._find_experiment()
+        # One MCP session and agent serve both steps
+        deps = _load_demo_deps()
+        with deps.LazyMCPClient(self.clearml_server_params) as clearml_tools:
+            agent = deps.CodeAgent(
+                tools=deps.cached_tools(clearml_tools),
+                model=self.model,
+                add_base_tools=False,
+                # Model output streams into our own live panel (see _run_streaming)
+                stream_outputs=True,
+                logger=deps.quiet_logger(),
+            )
+
+            # Step 1: Find the experiment
+            self._find_experiment(agent)
 
-        # Step 2: Analyze the experiment
-        self._analyze_experiment()
+            # Step 2: Analyze the experiment
+            self._analyze_experiment(agent)
 
         # Demo complete
         console.print()
@@ -80,7 +144,66 @@ class ClearMLDemo:
             console.print("[dim]⏱️  Demo completed - thank you for watching![/dim]")
             time.sleep(3)
 
-    def _find_experiment(self):
+    async def debug_experiments(self, experiment_ids):
+        """Analyze several experiments concurrently over one MCP session and model.
+
+        Returns one result per ID, in order; failed analyses are returned as exceptions.
+        """
+        deps = _load_demo_deps()
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+
+        with deps.LazyMCPClient(self.clearml_server_params) as clearml_tools:
+            tools = deps.cached_tools(clearml_tools)
+
+            async def analyze(experiment_id):
+                async with semaphore:
+                    # CodeAgent keeps per-run memory, so concurrent runs need their own
+                    agent = deps.CodeAgent(
+                        tools=tools,
+                        model=self.model,
+                        add_base_tools=False,
+                        logger=deps.quiet_logger(),
+                    )
+                    query = ANALYSIS_QUERY.format(exp=experiment_id)
+                    return await asyncio.to_thread(agent.run, query)
+
+            return await asyncio.gather(
+                *(analyze(experiment_id) for experiment_id in experiment_ids),
+                return_exceptions=True,
+            )
+
+    def run_batch(self, experiment_ids):
+        """Analyze the given experiments in one batch and summarize them in a table."""
+        console.print(
+            Panel.fit(
+                "[bold blue]🎯 ClearML MCP Batch Debugger[/bold blue]\n"
+                f"[dim]Analyzing {len(experiment_ids)} experiments over one MCP session[/dim]",
+                border_style="blue",
+            )
+        )
+        console.print()
+
+        with console.status("[yellow]📊 Analyzing scalar convergence patterns...[/yellow]"):
+            results = asyncio.run(self.debug_experiments(experiment_ids))
+
+        table = Table(title="📊 Convergence Analysis", show_lines=True)
+        table.add_column("Experiment", style="cyan", no_wrap=True)
+        table.add_column("Report")
+        for experiment_id, result in zip(experiment_ids, results, strict=True):
+            if isinstance(result, Exception):
+                report = Text(f"❌ Analysis failed: {result!s}", style="red")
+            else:
+                # Text, not markup: reports often contain [brackets]
+                report = Text(str(result))
+            table.add_row(experiment_id, report)
+        console.print(table)
+
+    def _run_streaming(self, agent, query, **run_kwargs: object):
+        """Run a query, showing the model output live until the final answer is ready."""
+        with Live(console=console, refresh_per_second=8, transient=True) as live:
+            return _load_demo_deps().stream_run(agent, query, live, **run_kwargs)
+
+    def _find_experiment(self, agent):
         """Find and validate the target experiment."""
         console.print("[yellow]📍 Step 1: Finding target experiment...[/yellow]")
 
@@ -89,33 +212,10 @@ class ClearMLDemo:
             console.print("[dim]⏱️  Pausing for demo readability...[/dim]")
             time.sleep(4)
 
-        target_experiment_name = "PyTorch with TensorBoard"
-
-        find_query = f"""
-        Discover and validate a ClearML experiment for analysis:
-
-        TARGET: Find a PyTorch experiment with TensorBoard logging in ClearML examples
-
-        DISCOVERY STRATEGY:
-        1. Use find_project_by_pattern with pattern "Pytorch" to find PyTorch-related projects
-        2. Look for projects that contain "Frameworks" and "Pytorch" in the name
-        3. Once you find the right project, use find_experiment_in_project with pattern "TensorBoard"
-        4. Find the experiment named "{target_experiment_name}"
-        5. Get the experiment ID, status, and verify it has scalar metrics
-        6. If dynamic discovery fails, fall back to known experiment ID: e-efe5f7a6c5f34a15b4bfbf1c33660e20
-
-        TOOLS TO USE:
-        - find_project_by_pattern(pattern="Pytorch")
-        - find_experiment_in_project(project_name=<found_project>, experiment_pattern="TensorBoard")
-        - get_task_info(task_id=<found_experiment_id>) to validate
-
-        IMPORTANT: Start your response with "EXPERIMENT_ID: [the actual ID]" followed by your discovery process and validation.
-        """
-
         # Print the query
         console.print(
             Panel(
-                f"[bold blue]📤 Query to LLM[/bold blue]\n\n[dim]{find_query.strip()}[/dim]",
+                f"[bold blue]📤 Query to LLM[/bold blue]\n\n[dim]{DISCOVERY_QUERY}[/dim]",
                 border_style="blue",
                 padding=(1, 2),
             )
@@ -126,53 +226,45 @@ class ClearMLDemo:
             console.print("[dim]⏱️  Allowing time to read query...[/dim]")
             time.sleep(3)
 
-        with MCPClient(self.clearml_server_params) as clearml_tools:
-            agent = CodeAgent(
-                tools=clearml_tools,
-                model=self.model,
-                add_base_tools=False,
-                verbosity_level=1,
-                max_steps=5,
+        try:
+            # The query names a fallback experiment ID; prefetching it would skip the search
+            result = self._run_streaming(agent, DISCOVERY_QUERY, max_steps=5, prefetch=False)
+            console.print(
+                Panel(
+                    f"[bold green]🔍 Experiment Discovery[/bold green]\n\n{result}",
+                    border_style="green",
+                    padding=(1, 2),
+                )
             )
 
-            try:
-                result = agent.run(find_query)
+            # Extract experiment ID from the result
+            if "EXPERIMENT_ID:" in result:
+                lines = result.split("\n")
+                for line in lines:
+                    if line.strip().startswith("EXPERIMENT_ID:"):
+                        self.experiment_id = line.split("EXPERIMENT_ID:")[1].strip()
+                        break
+
+            # Fallback if experiment ID extraction failed
+            if not self.experiment_id:
                 console.print(
-                    Panel(
-                        f"[bold green]🔍 Experiment Discovery[/bold green]\n\n{result}",
-                        border_style="green",
-                        padding=(1, 2),
-                    )
+                    "[yellow]⚠️  Search had issues - using known experiment ID for demo[/yellow]"
                 )
+                console.print(
+                    "[cyan]💡 In production, you'd retry the search or browse the project manually[/cyan]"
+                )
+                self.experiment_id = FALLBACK_EXPERIMENT_ID
+                console.print(f"[green]✅ Using experiment: {self.experiment_id}[/green]")
 
-                # Extract experiment ID from the result
-                if "EXPERIMENT_ID:" in result:
-                    lines = result.split("\n")
-                    for line in lines:
-                        if line.strip().startswith("EXPERIMENT_ID:"):
-                            self.experiment_id = line.split("EXPERIMENT_ID:")[1].strip()
-                            break
-
-                # Fallback if experiment ID extraction failed
-                if not self.experiment_id:
-                    console.print(
-                        "[yellow]⚠️  Search had issues - using known experiment ID for demo[/yellow]"
-                    )
-                    console.print(
-                        "[cyan]💡 In production, you'd retry the search or browse the project manually[/cyan]"
-                    )
-                    self.experiment_id = "e-efe5f7a6c5f34a15b4bfbf1c33660e20"
-                    console.print(f"[green]✅ Using experiment: {self.experiment_id}[/green]")
-
-                # Add demo pause
-                if os.getenv("DEMO_MODE") == "1":
-                    console.print("[dim]⏱️  Allowing time to read discovery results...[/dim]")
-                    time.sleep(6)
+            # Add demo pause
+            if os.getenv("DEMO_MODE") == "1":
+                console.print("[dim]⏱️  Allowing time to read discovery results...[/dim]")
+                time.sleep(6)
 
-            except Exception as e:
-                console.print(f"[red]❌ Experiment discovery failed: {e!s}[/red]")
+        except Exception as e:
+            console.print(f"[red]❌ Experiment discovery failed: {e!s}[/red]")
 
-    def _analyze_experiment(self):
+    def _analyze_experiment(self, agent):
         """Analyze the experiment's scalar convergence patterns."""
         console.print("[yellow]📊 Step 2: Analyzing scalar convergence patterns...[/yellow]")
 
@@ -193,29 +285,12 @@ class ClearMLDemo:
             console.print("[dim]⏱️  Setting up analysis workflow...[/dim]")
             time.sleep(3)
 
-        analysis_query = f"""
-        Analyze this ClearML experiment's scalar convergence patterns:
-
-        EXPERIMENT ID: {self.experiment_id}
-
-        DETAILED ANALYSIS TASKS:
-        1. Use ClearML MCP tools to retrieve all scalar metrics from this experiment
-        2. Extract training and validation metrics (loss, accuracy, etc.)
-        3. Calculate convergence rates from the retrieved values
-        4. Identify convergence quality (good/concerning/poor)
-        5. Check for overfitting signs in training vs validation metrics
-        6. Assess learning rate appropriateness based on convergence patterns
-        7. Determine optimal stopping point from the data
-        8. Provide specific, actionable recommendations
-
-        Focus on numerical evidence and actionable insights from the REAL experiment data.
-        Show your work with calculations and specific metric values.
-        """
+        analysis_query = ANALYSIS_QUERY.format(exp=self.experiment_id)
 
         # Print the query
         console.print(
             Panel(
-                f"[bold blue]📤 Query to LLM[/bold blue]\n\n[dim]{analysis_query.strip()}[/dim]",
+                f"[bold blue]📤 Query to LLM[/bold blue]\n\n[dim]{analysis_query}[/dim]",
                 border_style="blue",
                 padding=(1, 2),
             )
@@ -226,38 +301,49 @@ class ClearMLDemo:
             console.print("[dim]⏱️  Allowing time to read analysis query...[/dim]")
             time.sleep(4)
 
-        with MCPClient(self.clearml_server_params) as clearml_tools:
-            agent = CodeAgent(
-                tools=clearml_tools,
-                model=self.model,
-                add_base_tools=False,
-                verbosity_level=1,
-                max_steps=10,
-            )
-
-            try:
-                result = agent.run(analysis_query)
-                console.print(
-                    Panel(
-                        f"[bold green]📊 Convergence Analysis[/bold green]\n\n{result}",
-                        border_style="green",
-                        padding=(1, 2),
-                    )
+        try:
+            result = self._run_streaming(agent, analysis_query)
+            console.print(
+                Panel(
+                    f"[bold green]📊 Convergence Analysis[/bold green]\n\n{result}",
+                    border_style="green",
+                    padding=(1, 2),
                 )
+            )
 
-                # Add demo pause
-                if os.getenv("DEMO_MODE") == "1":
-                    console.print("[dim]⏱️  Allowing time to read detailed analysis...[/dim]")
-                    time.sleep(8)
+            # Add demo pause
+            if os.getenv("DEMO_MODE") == "1":
+                console.print("[dim]⏱️  Allowing time to read detailed analysis...[/dim]")
+                time.sleep(8)
 
-            except Exception as e:
-                console.print(f"[red]❌ Analysis failed: {e!s}[/red]")
+        except Exception as e:
+            console.print(f"[red]❌ Analysis failed: {e!s}[/red]")
 
 
 def main():
     """Main demo function."""
+    parser = argparse.ArgumentParser(description="ClearML MCP demo and experiment debugger")
+    parser.add_argument(
+        "--exp-id",
+        nargs="+",
+        metavar="ID",
+        help="Analyze these experiments in one batch instead of running the discovery demo",
+    )
+    args = parser.parse_args()
+
+    # Load environment variables from .env file
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+    except ImportError:
+        print("dotenv package not found, skipping.")
+
     demo = ClearMLDemo()
-    demo.run_demo()
+    if args.exp_id:
+        demo.run_batch(args.exp_id)
+    else:
+        demo.run_demo()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,257 @@
+"""
+A background ClearML MCP server shared by repeated example runs.
+
+Spawning the server over stdio costs a Python start-up, the ClearML import and a
+connection check on every run. `ensure_server` instead starts one server process,
+detached and serving MCP's streamable HTTP transport on a Unix socket, and later
+runs only connect to it. `stop_server` shuts it down; left alone, it exits after
+IDLE_TIMEOUT without requests.
+
+The socket is created with mode 0600 in a directory only the current user can open,
+so other users' processes (and web pages, which can't reach Unix sockets) can't call
+the tools with your ClearML credentials. The server is identified by its pid and a
+random ID from its launch before anything connects to or stops it. Start and
+stop are serialized with `fcntl.flock`, so this needs a POSIX system.
+"""
+
+import contextlib
+import importlib.util
+import json
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+from agent_setup import server_environment
+from mcp.client.stdio import get_default_environment
+from tool_cache import CACHE_DIR
+
+SERVER_DIR = CACHE_DIR / "server"
+SOCKET_PATH = SERVER_DIR / "mcp.sock"
+STATE_FILE = SERVER_DIR / "server.json"
+LOCK_FILE = SERVER_DIR / "server.lock"
+LOG_FILE = SERVER_DIR / "server.log"
+
+# Requests go over SOCKET_PATH; the host name is only there to make a valid URL
+BASE_URL = "http://clearml-mcp"
+IDENTITY_PATH = "/identity"
+SHUTDOWN_PATH = "/shutdown"
+
+# A random ID per launch, which the server reports and requires for shutdown
+LAUNCH_ID_ENV = "CLEARML_MCP_LAUNCH_ID"
+LAUNCH_ID_HEADER = "X-Launch-Id"
+
+# The server checks its ClearML connection before it starts listening
+STARTUP_TIMEOUT = 60  # seconds
+IDLE_TIMEOUT = 30 * 60  # seconds
+IDLE_CHECK_INTERVAL = 30  # seconds
+
+
+def _server_dir():
+    """Create SERVER_DIR, readable only by the current user."""
+    SERVER_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if SERVER_DIR.stat().st_uid != os.getuid():
+        raise RuntimeError(f"{SERVER_DIR} belongs to another user")
+    SERVER_DIR.chmod(0o700)
+    return SERVER_DIR
+
+
+@contextlib.contextmanager
+def _server_lock():
+    """Hold an exclusive lock on LOCK_FILE, serializing server start and stop."""
+    try:
+        import fcntl
+    except ImportError:
+        raise RuntimeError("The persistent ClearML MCP server needs a POSIX system") from None
+
+    _server_dir()
+    with LOCK_FILE.open("w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield  # Released when the file is closed
+
+
+def _read_state():
+    try:
+        return json.loads(STATE_FILE.read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _socket_client(timeout):
+    return httpx.Client(transport=httpx.HTTPTransport(uds=str(SOCKET_PATH)), timeout=timeout)
+
+
+def _is_running(state):
+    """Whether the server recorded in state is the one answering on SOCKET_PATH."""
+    if state is None:
+        return False
+    try:
+        with _socket_client(timeout=2) as client:
+            identity = client.get(BASE_URL + IDENTITY_PATH).json()
+    except (httpx.HTTPError, ValueError):
+        return False
+    return identity == {"pid": state["pid"], "launch_id": state["launch_id"]}
+
+
+def _log_tail(lines=20):
+    with contextlib.suppress(OSError):
+        return "\n".join(LOG_FILE.read_text(errors="replace").splitlines()[-lines:])
+    return ""
+
+
+def _serve_command():
+    return [sys.executable, __file__, "--serve"]
+
+
+def _start_server():
+    """Launch the server detached from this process and wait until it answers."""
+    if importlib.util.find_spec("clearml_mcp") is None:
+        raise RuntimeError(
+            "The persistent server runs clearml-mcp from this Python environment; "
+            "install it with `uv sync --group examples`"
+        )
+
+    state = {"launch_id": secrets.token_hex(16)}
+    with LOG_FILE.open("ab") as log:
+        process = subprocess.Popen(
+            _serve_command(),
+            env={
+                **get_default_environment(),
+                **server_environment(),
+                LAUNCH_ID_ENV: state["launch_id"],
+            },
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,  # Survives this run and its Ctrl+C
+        )
+    state["pid"] = process.pid
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while not _is_running(state):
+        if process.poll() is not None:
+            raise RuntimeError(f"ClearML MCP server exited during startup:\n{_log_tail()}")
+        if time.monotonic() > deadline:
+            process.terminate()
+            raise RuntimeError(f"ClearML MCP server did not start in time:\n{_log_tail()}")
+        time.sleep(0.1)
+    return state
+
+
+def _http_client(headers=None, timeout=None, auth=None):
+    """Build the MCP client's HTTP client, connecting through SOCKET_PATH."""
+    return httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(uds=str(SOCKET_PATH)),
+        headers=headers,
+        timeout=timeout or httpx.Timeout(30, read=300),  # The MCP client's defaults
+        auth=auth,
+        follow_redirects=True,
+    )
+
+
+def ensure_server():
+    """Return MCP client parameters for the background server, starting it if needed."""
+    with _server_lock():
+        state = _read_state()
+        if not _is_running(state):
+            state = _start_server()
+            STATE_FILE.write_text(json.dumps(state))
+    return {
+        "url": f"{BASE_URL}/mcp/",
+        "transport": "streamable-http",
+        "httpx_client_factory": _http_client,
+    }
+
+
+def stop_server():
+    """Stop the background server; return whether one was running."""
+    with _server_lock():
+        state = _read_state()
+        STATE_FILE.unlink(missing_ok=True)
+        if not _is_running(state):
+            return False
+        with _socket_client(timeout=5) as client:
+            response = client.post(
+                BASE_URL + SHUTDOWN_PATH, headers={LAUNCH_ID_HEADER: state["launch_id"]}
+            )
+            response.raise_for_status()
+        return True
+
+
+class IdleTracker:
+    """ASGI wrapper that tracks how long the app has had no requests in flight."""
+
+    def __init__(self, app):
+        self.app = app
+        self.active = 0
+        self.idle_since = time.monotonic()
+
+    async def __call__(self, scope, receive, send):
+        """Pass the request on to the app, counting it while in flight."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self.active += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.active -= 1
+            self.idle_since = time.monotonic()
+
+    def idle_for(self):
+        """Seconds since the last request finished, or 0 while one is in flight."""
+        return 0 if self.active else time.monotonic() - self.idle_since
+
+
+def _bind_private_socket():
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    SOCKET_PATH.unlink(missing_ok=True)
+    umask = os.umask(0o177)  # Created as 0600, never briefly open to others
+    try:
+        sock.bind(str(SOCKET_PATH))
+    finally:
+        os.umask(umask)
+    return sock
+
+
+def serve():
+    """Run the server on SOCKET_PATH until stopped or idle; the background process."""
+    import uvicorn
+    from starlette.responses import JSONResponse
+
+    from clearml_mcp import clearml_mcp
+
+    launch_id = os.environ.pop(LAUNCH_ID_ENV)
+    clearml_mcp.initialize_clearml_connection()
+
+    @clearml_mcp.mcp.custom_route(IDENTITY_PATH, methods=["GET"])
+    async def identity(_request):
+        return JSONResponse({"pid": os.getpid(), "launch_id": launch_id})
+
+    @clearml_mcp.mcp.custom_route(SHUTDOWN_PATH, methods=["POST"])
+    async def shutdown(request):
+        if not secrets.compare_digest(request.headers.get(LAUNCH_ID_HEADER, ""), launch_id):
+            return JSONResponse({"error": "unknown launch ID"}, status_code=403)
+        server.should_exit = True
+        return JSONResponse({"stopping": True})
+
+    app = IdleTracker(clearml_mcp.mcp.http_app(transport="streamable-http"))
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", timeout_graceful_shutdown=5))
+
+    def exit_when_idle():
+        while not server.should_exit:
+            time.sleep(IDLE_CHECK_INTERVAL)
+            if app.idle_for() > IDLE_TIMEOUT:
+                server.should_exit = True
+
+    threading.Thread(target=exit_when_idle, daemon=True).start()
+    _server_dir()
+    server.run(sockets=[_bind_private_socket()])
+
+
+if __name__ == "__main__" and sys.argv[1:] == ["--serve"]:
+    serve()
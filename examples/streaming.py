@@ -0,0 +1,51 @@
+"""
+Incremental rendering of agent output for the examples.
+
+`stream_run` runs a smolagents agent in streaming mode and repaints a Rich
+`Live` region as model tokens arrive, so long analyses are readable while they
+are generated (and Ctrl+C aborts mid-generation). The agent should be built
+with `stream_outputs=True` and `logger=quiet_logger()`, otherwise smolagents
+draws its own live view of the same tokens.
+"""
+
+from rich.console import Console
+from rich.panel import Panel
+from rich.text import Text
+from smolagents import AgentLogger, LogLevel
+from smolagents.memory import FinalAnswerStep
+from smolagents.models import ChatMessageStreamDelta
+
+
+def quiet_logger():
+    """An agent logger that renders nothing, leaving the terminal to `stream_run`."""
+    return AgentLogger(level=LogLevel.OFF, console=Console(quiet=True))
+
+
+def stream_run(agent, query, live, title="🤔 Thinking...", stop=None, **run_kwargs: object):
+    """Run the agent on query, streaming model output into live; return the final answer.
+
+    ``stop`` is an optional `threading.Event`; setting it from another thread abandons
+    the run at the next streamed event and returns None. Extra keyword arguments
+    (e.g. ``max_steps``) are passed through to ``agent.run``.
+    """
+    try:
+        events = agent.run(query, stream=True, **run_kwargs)
+    except TypeError:
+        # Agent without streaming support - fall back to the blocking call
+        return agent.run(query, **run_kwargs)
+
+    chunks = []
+    final_answer = None
+    for event in events:
+        if stop is not None and stop.is_set():
+            events.close()
+            return None
+        if isinstance(event, FinalAnswerStep):
+            final_answer = event.output
+        elif isinstance(event, ChatMessageStreamDelta) and event.content:
+            chunks.append(event.content)
+            # Text, not markup: model output often contains [brackets]
+            live.update(
+                Panel(Text("".join(chunks)), title=title, border_style="yellow", padding=(1, 2))
+            )
+    return final_answer
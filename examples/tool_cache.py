@@ -0,0 +1,317 @@
+"""
+Persistent cache for ClearML MCP tool results.
+
+The examples repeatedly query the same experiments for info, metrics and
+parameters. Wrapping the MCP tools in `CachedTool` memoizes each response on
+disk (SQLite, stdlib only) so re-runs and overlapping queries skip the ClearML
+REST round-trip. Entries expire after a TTL and are stamped with the
+clearml-mcp version that produced them; a version change invalidates them.
+Keys include the ClearML server configuration, so switching servers or
+credentials doesn't serve the previous server's results.
+
+`LazyMCPClient` applies the same idea to the tool list itself: the schemas from
+the first MCP handshake are stored on disk, and later runs build tools from
+them and only spawn the MCP server when a tool is actually called.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+from smolagents import MCPClient, Tool
+
+CACHE_DIR = Path(os.environ.get("CLEARML_MCP_CACHE_DIR", "~/.cache/clearml-mcp")).expanduser()
+DEFAULT_TTL = 3600  # seconds
+
+# Where the ClearML SDK looks for its configuration, in order, unless
+# CLEARML_CONFIG_FILE (or the legacy TRAINS_CONFIG_FILE) names a file
+CLEARML_CONFIG_FILES = ("~/trains.conf", "~/clearml.conf")
+
+# Tools whose names start with these verbs change server state and are never cached
+MUTATING_PREFIXES = ("create_", "update_", "delete_", "set_", "enqueue_", "reset_", "stop_")
+
+
+def clearml_mcp_version():
+    """Return the installed clearml-mcp version, used to stamp cache entries."""
+    try:
+        return version("clearml-mcp")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def clearml_server_identity():
+    """Fingerprint the ClearML server and credentials the MCP server will use.
+
+    Hashes the CLEARML_* / TRAINS_* environment (which overrides the config file) and
+    the active clearml.conf, without importing the ClearML SDK.
+    """
+    settings = sorted(
+        (key, value)
+        for key, value in os.environ.items()
+        if key.startswith(("CLEARML_", "TRAINS_")) and not key.startswith("CLEARML_MCP_")
+    )
+    config_file = os.environ.get("CLEARML_CONFIG_FILE") or os.environ.get("TRAINS_CONFIG_FILE")
+    candidates = [config_file] if config_file else CLEARML_CONFIG_FILES
+    config = ""
+    for candidate in candidates:
+        try:
+            config = Path(os.path.expandvars(candidate)).expanduser().read_text()
+            break
+        except OSError:
+            continue
+    payload = json.dumps([settings, config])
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class ToolResultCache:
+    """SQLite-backed key/value store with per-entry TTL and version metadata."""
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL):
+        self.path = Path(path) if path else CACHE_DIR / "tool-results.sqlite"
+        self.ttl = ttl
+        self.version = clearml_mcp_version()
+        self.server = clearml_server_identity()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT, version TEXT, created REAL)"
+            )
+
+    def _connect(self):
+        # A connection per operation keeps the cache safe to share between threads
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing, stale or from another version."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT value, version, created FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, entry_version, created = row
+        if entry_version != self.version or time.time() - created > self.ttl:
+            return None
+        return json.loads(value)
+
+    def set(self, key, value):
+        """Store a JSON-serializable value under key."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), self.version, time.time()),
+            )
+
+
+def is_error_result(value):
+    """ClearML MCP tools report failures as {"error": ...} payloads - don't cache those.
+
+    Tools that return lists wrap the error in one: [{"error": ...}].
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            return False
+    if isinstance(value, list):
+        return any(isinstance(item, dict) and "error" in item for item in value)
+    return isinstance(value, dict) and "error" in value
+
+
+class CachedTool(Tool):
+    """Wrap a smolagents MCP tool so identical calls are served from the on-disk cache."""
+
+    skip_forward_signature_validation = True
+
+    def __init__(self, tool, cache=None):
+        self.tool = tool
+        self.cache = cache or ToolResultCache()
+        self.name = tool.name
+        self.description = tool.description
+        self.inputs = tool.inputs
+        self.output_type = tool.output_type
+        self.is_initialized = True
+
+    @property
+    def cacheable(self):
+        """Whether this tool is read-only and safe to memoize."""
+        return not self.name.startswith(MUTATING_PREFIXES)
+
+    def cache_key(self, args, kwargs):
+        """Hash the ClearML server, tool name and arguments (keywords sorted) into a stable key."""
+        # MCP tools accept either keyword arguments or a single dict of them
+        if len(args) == 1 and isinstance(args[0], dict) and not kwargs:
+            args, kwargs = (), args[0]
+        payload = json.dumps(
+            [self.cache.server, self.name, list(args), kwargs], sort_keys=True, default=str
+        )
+        return hashlib.blake2b(payload.encode()).hexdigest()
+
+    def forward(self, *args: object, **kwargs: object):
+        """Return the cached result for these arguments, calling the wrapped tool on a miss."""
+        if not self.cacheable:
+            return self.tool(*args, **kwargs)
+
+        key = self.cache_key(args, kwargs)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self.tool(*args, **kwargs)
+        try:
+            if not is_error_result(result):
+                self.cache.set(key, result)
+        except TypeError:
+            pass  # Result isn't JSON-serializable - just don't cache it
+        return result
+
+
+def cached_tools(tools, ttl=DEFAULT_TTL):
+    """Wrap every tool in `CachedTool`, sharing one cache store."""
+    cache = ToolResultCache(ttl=ttl)
+    return [CachedTool(tool, cache) for tool in tools]
+
+
+def _tool_schemas(tools):
+    """The JSON-compatible schemas of tools, as stored in the schema cache."""
+    return json.loads(
+        json.dumps(
+            [
+                {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "inputs": tool.inputs,
+                    "output_type": tool.output_type,
+                }
+                for tool in tools
+            ]
+        )
+    )
+
+
+class ToolSchemaCache:
+    """JSON file of MCP tool schemas, keyed by server command, arguments and version."""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else CACHE_DIR / "tool-schemas.json"
+        self.version = clearml_mcp_version()
+
+    def key(self, server_params):
+        """Identify a server by how it is launched and the clearml-mcp version it runs."""
+        return json.dumps([server_params.command, list(server_params.args), self.version])
+
+    def _read(self):
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def get(self, server_params):
+        """Return the cached schemas for this server, or None if unknown."""
+        return self._read().get(self.key(server_params))
+
+    def set(self, server_params, tools):
+        """Store the schemas of tools, replacing entries from other versions."""
+        entries = {
+            key: schemas
+            for key, schemas in self._read().items()
+            if json.loads(key)[2] == self.version
+        }
+        entries[self.key(server_params)] = _tool_schemas(tools)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(entries))
+
+
+class LazyMCPTool(Tool):
+    """Tool built from a cached schema that forwards calls through a `LazyMCPClient`."""
+
+    skip_forward_signature_validation = True
+
+    def __init__(self, client, schema):
+        self.client = client
+        self.name = schema["name"]
+        self.description = schema["description"]
+        self.inputs = schema["inputs"]
+        self.output_type = schema["output_type"]
+        self.is_initialized = True
+
+    def forward(self, *args: object, **kwargs: object):
+        """Call the live MCP tool of the same name, connecting first if needed."""
+        return self.client.remote_tool(self.name)(*args, **kwargs)
+
+
+class LazyMCPClient:
+    """Drop-in for smolagents' `MCPClient` that defers the server spawn to the first tool call.
+
+    When the tool schemas for these server parameters are cached, `get_tools` returns
+    `LazyMCPTool` stand-ins without starting the server. Otherwise it connects right
+    away, like `MCPClient`, and caches the schemas for the next run. Once connected,
+    the cache is refreshed if the server's tools no longer match it (e.g. after
+    editing the server in a source checkout, where the version stays the same).
+    """
+
+    def __init__(self, server_params, schema_cache=None):
+        self.server_params = server_params
+        self.schema_cache = schema_cache or ToolSchemaCache()
+        self._client = None
+        self._remote_tools = {}
+        self._lock = threading.Lock()
+
+        self._cached_schemas = self.schema_cache.get(server_params)
+        if self._cached_schemas is None:
+            self.connect()
+            self._tools = list(self._remote_tools.values())
+        else:
+            self._tools = [LazyMCPTool(self, schema) for schema in self._cached_schemas]
+
+    @property
+    def connected(self):
+        """Whether the MCP server has been started."""
+        return self._client is not None
+
+    def connect(self):
+        """Start the MCP server, if it isn't running yet."""
+        with self._lock:
+            if self._client is None:
+                client = MCPClient(self.server_params)
+                tools = client.get_tools()
+                self._remote_tools = {tool.name: tool for tool in tools}
+                self._client = client
+                if _tool_schemas(tools) != self._cached_schemas:
+                    self.schema_cache.set(self.server_params, tools)
+
+    def remote_tool(self, name):
+        """Return the live MCP tool called name, connecting on first use."""
+        self.connect()
+        tool = self._remote_tools.get(name)
+        if tool is None:
+            raise RuntimeError(
+                f"The ClearML MCP server no longer provides {name!r}; "
+                "its tool list has been refreshed for the next run"
+            )
+        return tool
+
+    def get_tools(self):
+        """The tools exposed by the server (live or cached stand-ins)."""
+        return self._tools
+
+    def disconnect(self, *exc_info: object):
+        """Shut down the MCP server if it was started."""
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.disconnect(*exc_info)
+
+    def __enter__(self):
+        return self.get_tools()
+
+    def __exit__(self, *exc_info: object):
+        self.disconnect(*exc_info)
@@ -1,5 +1,10 @@
 """ClearML MCP Server implementation."""
 
+import itertools
+import math
+import threading
+import time
+from collections import OrderedDict
 from typing import Any
 
 from clearml import Model, Task
@@ -7,6 +12,14 @@ from fastmcp import FastMCP
 
 mcp = FastMCP("clearml-mcp")
 
+# Tasks fetched by the tools are reused for a short while, so an agent calling
+# several tools on the same task pays for one ClearML round-trip
+TASK_CACHE_SIZE = 256
+TASK_CACHE_TTL = 60  # seconds
+
+_task_cache: OrderedDict[str, tuple[float, Task]] = OrderedDict()
+_task_cache_lock = threading.Lock()
+
 
 def initialize_clearml_connection() -> None:
     """Initialize and validate ClearML connection."""
@@ -18,11 +31,51 @@ def initialize_clearml_connection() -> None:
         raise RuntimeError(f"Failed to initialize ClearML connection: {e!s}")
 
 
+def summarize_series(values: list[float]) -> dict[str, float | None]:
+    """Summarize a non-empty scalar series by its last, min and max values.
+
+    NaN points (e.g. from a diverged run) are skipped for min and max, which are None
+    for an all-NaN series. A NaN last value is reported as None, as JSON has no NaN.
+    """
+    last_value = values[-1]
+    # A NaN anywhere makes the sum NaN; only then pay for filtering the series
+    if math.isnan(sum(values)):
+        values = list(itertools.filterfalse(math.isnan, values))
+    return {
+        "last_value": None if math.isnan(last_value) else last_value,
+        "min_value": min(values, default=None),
+        "max_value": max(values, default=None),
+    }
+
+
+def get_cached_task(task_id: str) -> Task:
+    """Return the task, reusing one fetched within the last TASK_CACHE_TTL seconds."""
+    with _task_cache_lock:
+        entry = _task_cache.get(task_id)
+        if entry is not None and time.monotonic() - entry[0] < TASK_CACHE_TTL:
+            _task_cache.move_to_end(task_id)
+            return entry[1]
+
+    task = Task.get_task(task_id=task_id)
+    with _task_cache_lock:
+        _task_cache[task_id] = (time.monotonic(), task)
+        _task_cache.move_to_end(task_id)
+        while len(_task_cache) > TASK_CACHE_SIZE:
+            _task_cache.popitem(last=False)
+    return task
+
+
+def clear_task_cache() -> None:
+    """Forget all cached tasks."""
+    with _task_cache_lock:
+        _task_cache.clear()
+
+
 @mcp.tool()
 async def get_task_info(task_id: str) -> dict[str, Any]:
     """Get ClearML task details, parameters, and status."""
     try:
-        task = Task.get_task(task_id=task_id)
+        task = get_cached_task(task_id)
         return {
             "id": task.id,
             "name": task.name,
@@ -57,7 +110,7 @@ async def list_tasks(
         tasks = []
         for task_id in task_ids:
             try:
-                task = Task.get_task(task_id=task_id)
+                task = get_cached_task(task_id)
                 tasks.append(
                     {
                         "id": task.id,
@@ -81,7 +134,7 @@ async def list_tasks(
 async def get_task_parameters(task_id: str) -> dict[str, Any]:
     """Get task hyperparameters and configuration."""
     try:
-        task = Task.get_task(task_id=task_id)
+        task = get_cached_task(task_id)
         return task.get_parameters_as_dict()
     except Exception as e:
         return {"error": f"Failed to get task parameters: {e!s}"}
@@ -91,7 +144,7 @@ async def get_task_parameters(task_id: str) -> dict[str, Any]:
 async def get_task_metrics(task_id: str) -> dict[str, Any]:
     """Get task training metrics and scalars."""
     try:
-        task = Task.get_task(task_id=task_id)
+        task = get_cached_task(task_id)
         scalars = task.get_reported_scalars()
 
         metrics = {}
@@ -99,12 +152,11 @@ async def get_task_metrics(task_id: str) -> dict[str, Any]:
             metrics[metric] = {}
             for variant, data in variants.items():
                 if data and "y" in data:
-                    metrics[metric][variant] = {
-                        "last_value": data["y"][-1] if data["y"] else None,
-                        "min_value": min(data["y"]) if data["y"] else None,
-                        "max_value": max(data["y"]) if data["y"] else None,
-                        "iterations": len(data["y"]),
-                    }
+                    if data["y"]:
+                        summary = summarize_series(data["y"])
+                    else:
+                        summary = dict.fromkeys(("last_value", "min_value", "max_value"))
+                    metrics[metric][variant] = {**summary, "iterations": len(data["y"])}
         return metrics
     except Exception as e:
         return {"error": f"Failed to get task metrics: {e!s}"}
@@ -114,7 +166,7 @@ async def get_task_metrics(task_id: str) -> dict[str, Any]:
 async def get_task_artifacts(task_id: str) -> dict[str, Any]:
     """Get task artifacts and outputs."""
     try:
-        task = Task.get_task(task_id=task_id)
+        task = get_cached_task(task_id)
         artifacts = task.artifacts
 
         artifact_dict = {}
@@ -135,7 +187,7 @@ async def get_task_artifacts(task_id: str) -> dict[str, Any]:
 async def get_model_info(task_id: str) -> dict[str, Any]:
     """Get model metadata and configuration."""
     try:
-        task = Task.get_task(task_id=task_id)
+        task = get_cached_task(task_id)
         models = task.models
 
         model_info = {"input": [], "output": []}
@@ -192,7 +244,7 @@ async def list_models(project_name: str | None = None) -> list[dict[str, Any]]:
 async def get_model_artifacts(task_id: str) -> dict[str, Any]:
     """Get model files and download URLs."""
     try:
-        task = Task.get_task(task_id=task_id)
+        task = get_cached_task(task_id)
         models = task.models
 
         artifacts = {"input_models": [], "output_models": []}
@@ -262,7 +314,7 @@ async def find_experiment_in_project(
 
         for task_id in task_ids:
             try:
-                task = Task.get_task(task_id=task_id)
+                task = get_cached_task(task_id)
                 if pattern_lower in task.name.lower():
                     matching_experiments.append(
                         {
@@ -326,7 +378,7 @@ async def compare_tasks(task_ids: list[str], metrics: list[str] | None = None) -
         comparison = {}
 
         for task_id in task_ids:
-            task = Task.get_task(task_id=task_id)
+            task = get_cached_task(task_id)
             scalars = task.get_reported_scalars()
 
             task_metrics = {"name": task.name, "status": task.status, "metrics": {}}
@@ -337,21 +389,15 @@ async def compare_tasks(task_ids: list[str], metrics: list[str] | None = None) -
                         task_metrics["metrics"][metric] = {}
                         for variant, data in scalars[metric].items():
                             if data and "y" in data and data["y"]:
-                                task_metrics["metrics"][metric][variant] = {
-                                    "last_value": data["y"][-1],
-                                    "min_value": min(data["y"]),
-                                    "max_value": max(data["y"]),
-                                }
+                                task_metrics["metrics"][metric][variant] = summarize_series(
+                                    data["y"]
+                                )
             else:
                 for metric, variants in scalars.items():
                     task_metrics["metrics"][metric] = {}
                     for variant, data in variants.items():
                         if data and "y" in data and data["y"]:
-                            task_metrics["metrics"][metric][variant] = {
-                                "last_value": data["y"][-1],
-                                "min_value": min(data["y"]),
-                                "max_value": max(data["y"]),
-                            }
+                            task_metrics["metrics"][metric][variant] = summarize_series(data["y"])
 
             comparison[task_id] = task_metrics
 
@@ -372,7 +418,7 @@ async def search_tasks(query: str, project_name: str | None = None) -> list[dict
 
         for task_id in task_ids:
             try:
-                task = Task.get_task(task_id=task_id)
+                task = get_cached_task(task_id)
 
                 # Check if the task matches the search query
                 task_name = task.name.lower()
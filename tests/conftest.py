@@ -0,0 +1,37 @@
+"""Shared fixtures for ClearML MCP server tests."""
+
+from unittest.mock import Mock
+
+import pytest
+
+
+def _populate_task(task):
+    """Give a task mock the fields of a typical finished training task."""
+    task.id = "task_123"
+    task.name = "Training Experiment"
+    task.status = "completed"
+    task.get_project_name.return_value = "ML Project"
+    task.data.created = "2024-01-01T00:00:00Z"
+    task.data.last_update = "2024-01-01T02:00:00Z"
+    task.data.tags = ["training", "production"]
+    task.task_type = "training"
+    task.comment = "Experiment with improved accuracy"
+    task.artifacts = {}
+    task.models = {"input": [], "output": []}
+    task.get_parameters_as_dict.return_value = {}
+    task.get_reported_scalars.return_value = {}
+
+
+@pytest.fixture(scope="session")
+def mock_task_instance():
+    """A single task mock shared by the whole session; reset before every test."""
+    task = Mock()
+    _populate_task(task)
+    return task
+
+
+@pytest.fixture(autouse=True)
+def reset_mock_task_instance(mock_task_instance):
+    """Undo overrides and recorded calls from the previous test."""
+    mock_task_instance.reset_mock(return_value=True, side_effect=True)
+    _populate_task(mock_task_instance)
@@ -1,35 +1,47 @@
 """Behavioral tests for ClearML MCP server."""
 
-from unittest.mock import Mock, patch
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
 from clearml_mcp import clearml_mcp
 
 
+@pytest.fixture(autouse=True)
+def patched_task(monkeypatch):
+    """Replace the ClearML Task class used by the server with a mock for every test."""
+    mock = MagicMock()
+    monkeypatch.setattr(clearml_mcp, "Task", mock)
+    return mock
+
+
+@pytest.fixture(autouse=True)
+def empty_task_cache():
+    """Start every test without tasks cached by a previous one."""
+    clearml_mcp.clear_task_cache()
+
+
 class TestClearMLConnection:
     """Test ClearML connection initialization behavior."""
 
-    @patch("clearml_mcp.clearml_mcp.Task")
-    def test_successful_connection_requires_accessible_projects(self, mock_task):
+    def test_successful_connection_requires_accessible_projects(self, patched_task):
         """Connection succeeds when projects are accessible."""
-        mock_task.get_projects.return_value = [Mock(name="project1")]
+        patched_task.get_projects.return_value = [SimpleNamespace(name="project1")]
 
         # Should not raise
         clearml_mcp.initialize_clearml_connection()
 
-    @patch("clearml_mcp.clearml_mcp.Task")
-    def test_connection_fails_when_no_projects_accessible(self, mock_task):
+    def test_connection_fails_when_no_projects_accessible(self, patched_task):
         """Connection fails when no projects are accessible."""
-        mock_task.get_projects.return_value = []
+        patched_task.get_projects.return_value = []
 
         with pytest.raises(RuntimeError, match="No ClearML projects accessible"):
             clearml_mcp.initialize_clearml_connection()
 
-    @patch("clearml_mcp.clearml_mcp.Task")
-    def test_connection_fails_on_api_error(self, mock_task):
+    def test_connection_fails_on_api_error(self, patched_task):
         """Connection fails gracefully on API errors."""
-        mock_task.get_projects.side_effect = Exception("API Error")
+        patched_task.get_projects.side_effect = Exception("API Error")
 
         with pytest.raises(RuntimeError, match="Failed to initialize ClearML connection"):
             clearml_mcp.initialize_clearml_connection()
@@ -39,22 +51,10 @@ class TestTaskInfo:
     """Test task information retrieval behavior."""
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_returns_complete_task_information(self, mock_task):
+    async def test_returns_complete_task_information(self, patched_task, mock_task_instance):
         """get_task_info returns all expected task fields."""
-        # Arrange: Create a realistic task mock
-        task = Mock()
-        task.id = "task_123"
-        task.name = "Training Experiment"
-        task.status = "completed"
-        task.get_project_name.return_value = "ML Project"
-        task.data.created = "2024-01-01T00:00:00Z"
-        task.data.last_update = "2024-01-01T02:00:00Z"
-        task.data.tags = ["training", "production"]
-        task.task_type = "training"
-        task.comment = "Experiment with improved accuracy"
-
-        mock_task.get_task.return_value = task
+        # Arrange: the shared task mock is already a realistic training task
+        patched_task.get_task.return_value = mock_task_instance
 
         # Act
         result = await clearml_mcp.get_task_info.fn("task_123")
@@ -71,19 +71,17 @@ class TestTaskInfo:
         assert result["comment"] == "Experiment with improved accuracy"
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_handles_task_without_optional_fields(self, mock_task):
+    async def test_handles_task_without_optional_fields(self, patched_task, mock_task_instance):
         """get_task_info gracefully handles tasks missing optional fields."""
         # Arrange: Create task mock missing some fields
-        task = Mock()
-        task.id = "task_456"
-        task.name = "Basic Task"
-        task.status = "running"
-        task.get_project_name.return_value = "Test Project"
-        task.data.created = "2024-01-01T00:00:00Z"
-        task.data.last_update = "2024-01-01T00:00:00Z"
-        task.data.tags = None
-        task.task_type = "inference"
+        mock_task_instance.id = "task_456"
+        mock_task_instance.name = "Basic Task"
+        mock_task_instance.status = "running"
+        mock_task_instance.get_project_name.return_value = "Test Project"
+        mock_task_instance.data.created = "2024-01-01T00:00:00Z"
+        mock_task_instance.data.last_update = "2024-01-01T00:00:00Z"
+        mock_task_instance.data.tags = None
+        mock_task_instance.task_type = "inference"
 
         # Mock hasattr to return False for comment attribute
         def mock_hasattr(obj, attr):
@@ -91,7 +89,7 @@ class TestTaskInfo:
                 return False
             return True
 
-        mock_task.get_task.return_value = task
+        patched_task.get_task.return_value = mock_task_instance
 
         with patch("builtins.hasattr", side_effect=mock_hasattr):
             result = await clearml_mcp.get_task_info.fn("task_456")
@@ -105,27 +103,115 @@ class TestTaskInfo:
         assert result["tags"] == []
         assert result["comment"] is None
 
+
+class TestTaskCache:
+    """Test reuse of fetched tasks across tool calls."""
+
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_returns_error_for_invalid_task_id(self, mock_task):
-        """get_task_info returns error message for invalid task ID."""
-        mock_task.get_task.side_effect = Exception("Task not found")
+    async def test_tools_share_one_fetch_per_task(self, patched_task, mock_task_instance):
+        """Several tools on the same task fetch it from ClearML only once."""
+        patched_task.get_task.return_value = mock_task_instance
 
-        result = await clearml_mcp.get_task_info.fn("invalid_id")
+        await clearml_mcp.get_task_info.fn("task_123")
+        await clearml_mcp.get_task_parameters.fn("task_123")
+        await clearml_mcp.get_task_metrics.fn("task_123")
+
+        patched_task.get_task.assert_called_once_with(task_id="task_123")
+
+    @pytest.mark.asyncio
+    async def test_refetches_task_after_ttl(self, monkeypatch, patched_task, mock_task_instance):
+        """Cached tasks expire after TASK_CACHE_TTL seconds."""
+        monkeypatch.setattr(clearml_mcp, "TASK_CACHE_TTL", 0)
+        patched_task.get_task.return_value = mock_task_instance
+
+        await clearml_mcp.get_task_info.fn("task_123")
+        await clearml_mcp.get_task_info.fn("task_123")
+
+        assert patched_task.get_task.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_is_not_cached(self, patched_task, mock_task_instance):
+        """A task that failed to load is fetched again on the next call."""
+        patched_task.get_task.side_effect = [Exception("Timeout"), mock_task_instance]
+
+        first = await clearml_mcp.get_task_info.fn("task_123")
+        second = await clearml_mcp.get_task_info.fn("task_123")
+
+        assert "error" in first
+        assert second["id"] == "task_123"
+
+
+class TestTaskRetrievalFailure:
+    """Test that tools report a task that cannot be fetched as an error."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("tool", "args", "message"),
+        [
+            pytest.param(
+                clearml_mcp.get_task_info,
+                ("invalid_id",),
+                "Failed to get task info",
+                id="get_task_info",
+            ),
+            pytest.param(
+                clearml_mcp.get_task_parameters,
+                ("task_123",),
+                "Failed to get task parameters",
+                id="get_task_parameters",
+            ),
+            pytest.param(
+                clearml_mcp.get_task_metrics,
+                ("task_123",),
+                "Failed to get task metrics",
+                id="get_task_metrics",
+            ),
+            pytest.param(
+                clearml_mcp.get_task_artifacts,
+                ("task_123",),
+                "Failed to get task artifacts",
+                id="get_task_artifacts",
+            ),
+            pytest.param(
+                clearml_mcp.get_model_info,
+                ("task_123",),
+                "Failed to get model info",
+                id="get_model_info",
+            ),
+            pytest.param(
+                clearml_mcp.get_model_artifacts,
+                ("task_123",),
+                "Failed to get model artifacts",
+                id="get_model_artifacts",
+            ),
+            pytest.param(
+                clearml_mcp.compare_tasks,
+                (["task_1"], ["loss"]),
+                "Failed to compare tasks",
+                id="compare_tasks",
+            ),
+        ],
+    )
+    async def test_returns_error_when_task_cannot_be_fetched(
+        self, patched_task, tool, args, message
+    ):
+        """Task tools return an error payload instead of raising."""
+        patched_task.get_task.side_effect = Exception("Task access denied")
+
+        result = await tool.fn(*args)
 
         assert "error" in result
-        assert "Failed to get task info" in result["error"]
+        assert message in result["error"]
 
 
 class TestTaskListing:
     """Test task listing behavior with different filters."""
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_lists_all_tasks_without_filters(self, mock_task):
+    async def test_lists_all_tasks_without_filters(self, patched_task):
         """list_tasks returns all tasks when no filters applied."""
         # Arrange: Mock the Task.query_tasks to return task IDs
-        mock_task.query_tasks.return_value = ["task_1", "task_2"]
+        patched_task.query_tasks.return_value = ["task_1", "task_2"]
 
         def mock_get_task(task_id):
             if task_id == "task_1":
@@ -144,7 +230,7 @@ class TestTaskListing:
             task.data.created = "2024-01-02T00:00:00Z"
             return task
 
-        mock_task.get_task.side_effect = mock_get_task
+        patched_task.get_task.side_effect = mock_get_task
 
         result = await clearml_mcp.list_tasks.fn()
 
@@ -153,11 +239,10 @@ class TestTaskListing:
         assert result[1]["id"] == "task_2"
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_filters_tasks_by_project_and_status(self, mock_task):
+    async def test_filters_tasks_by_project_and_status(self, patched_task):
         """list_tasks correctly applies project and status filters."""
         # Arrange
-        mock_task.query_tasks.return_value = ["task_1"]
+        patched_task.query_tasks.return_value = ["task_1"]
 
         def mock_get_task(task_id):
             task = Mock()
@@ -169,7 +254,7 @@ class TestTaskListing:
             task.data.tags = []
             return task
 
-        mock_task.get_task.side_effect = mock_get_task
+        patched_task.get_task.side_effect = mock_get_task
 
         # Act
         result = await clearml_mcp.list_tasks.fn(
@@ -177,27 +262,25 @@ class TestTaskListing:
         )
 
         # Assert: Verify filters were passed to query_tasks
-        mock_task.query_tasks.assert_called_once_with(
+        patched_task.query_tasks.assert_called_once_with(
             project_name="Filtered Project", task_filter={"status": ["completed"]}, tags=None
         )
         assert len(result) == 1
         assert result[0]["status"] == "completed"
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_handles_empty_task_list(self, mock_task):
+    async def test_handles_empty_task_list(self, patched_task):
         """list_tasks handles empty results gracefully."""
-        mock_task.query_tasks.return_value = []
+        patched_task.query_tasks.return_value = []
 
         result = await clearml_mcp.list_tasks.fn()
 
         assert result == []
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_returns_error_on_query_failure(self, mock_task):
+    async def test_returns_error_on_query_failure(self, patched_task):
         """list_tasks returns error when query fails."""
-        mock_task.query_tasks.side_effect = Exception("Query failed")
+        patched_task.query_tasks.side_effect = Exception("Query failed")
 
         result = await clearml_mcp.list_tasks.fn()
 
@@ -206,11 +289,10 @@ class TestTaskListing:
         assert "Failed to list tasks" in result[0]["error"]
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_handles_individual_task_retrieval_failure(self, mock_task):
+    async def test_handles_individual_task_retrieval_failure(self, patched_task):
         """list_tasks handles failures when retrieving individual tasks."""
         # Arrange: Query succeeds but individual task retrieval fails
-        mock_task.query_tasks.return_value = ["task_1", "task_2"]
+        patched_task.query_tasks.return_value = ["task_1", "task_2"]
 
         def mock_get_task(task_id):
             if task_id == "task_1":
@@ -224,7 +306,7 @@ class TestTaskListing:
             task.data.tags = []
             return task
 
-        mock_task.get_task.side_effect = mock_get_task
+        patched_task.get_task.side_effect = mock_get_task
 
         result = await clearml_mcp.list_tasks.fn()
 
@@ -240,17 +322,15 @@ class TestTaskParameters:
     """Test task parameter retrieval behavior."""
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_returns_task_parameters_structure(self, mock_task):
+    async def test_returns_task_parameters_structure(self, patched_task, mock_task_instance):
         """get_task_parameters returns properly structured parameter data."""
         # Arrange
-        task = Mock()
-        task.get_parameters_as_dict.return_value = {
+        mock_task_instance.get_parameters_as_dict.return_value = {
             "General": {"learning_rate": 0.001, "batch_size": 32},
             "Model": {"layers": 3, "neurons": 128},
         }
 
-        mock_task.get_task.return_value = task
+        patched_task.get_task.return_value = mock_task_instance
 
         # Act
         result = await clearml_mcp.get_task_parameters.fn("task_123")
@@ -260,40 +340,23 @@ class TestTaskParameters:
         assert result["Model"]["layers"] == 3
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_handles_task_without_parameters(self, mock_task):
+    async def test_handles_task_without_parameters(self, patched_task, mock_task_instance):
         """get_task_parameters handles tasks with no parameters."""
-        task = Mock()
-        task.get_parameters_as_dict.return_value = {}
-
-        mock_task.get_task.return_value = task
+        patched_task.get_task.return_value = mock_task_instance
 
         result = await clearml_mcp.get_task_parameters.fn("task_123")
 
         assert result == {}
 
-    @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_returns_error_on_parameter_retrieval_failure(self, mock_task):
-        """get_task_parameters returns error when parameter retrieval fails."""
-        mock_task.get_task.side_effect = Exception("Parameter access denied")
-
-        result = await clearml_mcp.get_task_parameters.fn("task_123")
-
-        assert "error" in result
-        assert "Failed to get task parameters" in result["error"]
-
 
 class TestTaskMetrics:
     """Test task metrics retrieval behavior."""
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_processes_metrics_with_complete_data(self, mock_task):
+    async def test_processes_metrics_with_complete_data(self, patched_task, mock_task_instance):
         """get_task_metrics correctly processes scalar metrics data."""
         # Arrange: Create realistic metrics data
-        task = Mock()
-        task.get_reported_scalars.return_value = {
+        mock_task_instance.get_reported_scalars.return_value = {
             "loss": {
                 "train": {"x": [1, 2, 3], "y": [0.8, 0.6, 0.4]},
                 "validation": {"x": [1, 2, 3], "y": [0.9, 0.7, 0.5]},
@@ -303,7 +366,7 @@ class TestTaskMetrics:
             },
         }
 
-        mock_task.get_task.return_value = task
+        patched_task.get_task.return_value = mock_task_instance
 
         # Act
         result = await clearml_mcp.get_task_metrics.fn("task_123")
@@ -316,16 +379,16 @@ class TestTaskMetrics:
 
         # Verify statistical calculations
         train_loss = result["loss"]["train"]
-        assert train_loss["last_value"] == 0.4
-        assert train_loss["min_value"] == 0.4
-        assert train_loss["max_value"] == 0.8
+        assert [
+            train_loss["last_value"],
+            train_loss["min_value"],
+            train_loss["max_value"],
+        ] == pytest.approx([0.4, 0.4, 0.8], rel=1e-6)
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_handles_metrics_with_empty_data(self, mock_task):
+    async def test_handles_metrics_with_empty_data(self, patched_task, mock_task_instance):
         """get_task_metrics handles metrics with empty or missing data."""
-        task = Mock()
-        task.get_reported_scalars.return_value = {
+        mock_task_instance.get_reported_scalars.return_value = {
             "loss": {
                 "train": {"x": [], "y": []},  # Empty data - should be skipped
             },
@@ -334,7 +397,7 @@ class TestTaskMetrics:
             },
         }
 
-        mock_task.get_task.return_value = task
+        patched_task.get_task.return_value = mock_task_instance
 
         result = await clearml_mcp.get_task_metrics.fn("task_123")
 
@@ -348,64 +411,90 @@ class TestTaskMetrics:
         assert result["accuracy"] == {}
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_handles_task_without_metrics(self, mock_task):
-        """get_task_metrics handles tasks with no reported metrics."""
-        task = Mock()
-        task.get_reported_scalars.return_value = {}
+    async def test_summarizes_long_series_as_plain_floats(self, patched_task, mock_task_instance):
+        """get_task_metrics returns JSON-friendly floats for long scalar series."""
+        loss = [1.0 / (step + 1) for step in range(10_000)]
+        mock_task_instance.get_reported_scalars.return_value = {
+            "loss": {"train": {"x": list(range(10_000)), "y": loss}},
+        }
+        patched_task.get_task.return_value = mock_task_instance
+
+        result = await clearml_mcp.get_task_metrics.fn("task_123")
 
-        mock_task.get_task.return_value = task
+        train_loss = result["loss"]["train"]
+        assert [
+            train_loss["last_value"],
+            train_loss["min_value"],
+            train_loss["max_value"],
+        ] == pytest.approx([1e-4, 1e-4, 1.0], rel=1e-6)
+        assert train_loss["iterations"] == 10_000
+        assert all(
+            type(train_loss[key]) is float for key in ("last_value", "min_value", "max_value")
+        )
+
+    @pytest.mark.asyncio
+    async def test_skips_nan_points_in_summary(self, patched_task, mock_task_instance):
+        """get_task_metrics ignores NaN losses for min/max and reports a NaN last value as None."""
+        mock_task_instance.get_reported_scalars.return_value = {
+            "loss": {
+                "train": {"x": [0, 1, 2, 3], "y": [0.8, 0.5, float("nan"), float("nan")]},
+                "diverged": {"x": [0, 1], "y": [float("nan"), float("nan")]},
+                "epoch": {"x": [0, 1, 2], "y": [1, 2, 3]},
+            },
+        }
+        patched_task.get_task.return_value = mock_task_instance
 
         result = await clearml_mcp.get_task_metrics.fn("task_123")
 
-        assert result == {}
+        train_loss = result["loss"]["train"]
+        assert train_loss["last_value"] is None
+        assert [train_loss["min_value"], train_loss["max_value"]] == pytest.approx(
+            [0.5, 0.8], rel=1e-6
+        )
+        diverged = result["loss"]["diverged"]
+        assert diverged["min_value"] is diverged["max_value"] is None
+        epoch = result["loss"]["epoch"]
+        assert (epoch["last_value"], epoch["max_value"]) == (3, 3)
+        assert type(epoch["max_value"]) is int
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_returns_error_on_metrics_retrieval_failure(self, mock_task):
-        """get_task_metrics returns error when metrics retrieval fails."""
-        mock_task.get_task.side_effect = Exception("Metrics access denied")
+    async def test_handles_task_without_metrics(self, patched_task, mock_task_instance):
+        """get_task_metrics handles tasks with no reported metrics."""
+        patched_task.get_task.return_value = mock_task_instance
 
         result = await clearml_mcp.get_task_metrics.fn("task_123")
 
-        assert "error" in result
-        assert "Failed to get task metrics" in result["error"]
+        assert result == {}
 
 
 class TestTaskArtifacts:
     """Test task artifact retrieval behavior."""
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_returns_artifact_information(self, mock_task):
+    async def test_returns_artifact_information(self, patched_task, mock_task_instance):
         """get_task_artifacts returns artifact details correctly."""
         # Arrange
-        artifact1 = Mock()
-        artifact1.type = "model"
-        artifact1.mode = "output"
-        artifact1.uri = "s3://bucket/model.pkl"
-        artifact1.content_type = "application/octet-stream"
-        artifact1.timestamp = "2024-01-01T00:00:00Z"
-
-        artifact2 = Mock()
-        artifact2.type = "data"
-        artifact2.mode = "input"
-        artifact2.uri = "file://data/train.csv"
-        artifact2.content_type = "text/csv"
-
-        # Mock hasattr to control which attributes are available
-        def mock_hasattr(obj, attr):
-            if obj is artifact2 and attr == "timestamp":
-                return False
-            return True
+        artifact1 = SimpleNamespace(
+            type="model",
+            mode="output",
+            uri="s3://bucket/model.pkl",
+            content_type="application/octet-stream",
+            timestamp="2024-01-01T00:00:00Z",
+        )
 
-        task = Mock()
-        task.artifacts = {"model": artifact1, "dataset": artifact2}
+        # No timestamp attribute
+        artifact2 = SimpleNamespace(
+            type="data",
+            mode="input",
+            uri="file://data/train.csv",
+            content_type="text/csv",
+        )
 
-        mock_task.get_task.return_value = task
+        mock_task_instance.artifacts = {"model": artifact1, "dataset": artifact2}
 
-        with patch("builtins.hasattr", side_effect=mock_hasattr):
-            result = await clearml_mcp.get_task_artifacts.fn("task_123")
+        patched_task.get_task.return_value = mock_task_instance
+
+        result = await clearml_mcp.get_task_artifacts.fn("task_123")
 
         # Assert
         assert "model" in result
@@ -416,57 +505,44 @@ class TestTaskArtifacts:
         assert result["dataset"]["timestamp"] is None
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_handles_task_without_artifacts(self, mock_task):
+    async def test_handles_task_without_artifacts(self, patched_task, mock_task_instance):
         """get_task_artifacts handles tasks with no artifacts."""
-        task = Mock()
-        task.artifacts = {}
-
-        mock_task.get_task.return_value = task
+        patched_task.get_task.return_value = mock_task_instance
 
         result = await clearml_mcp.get_task_artifacts.fn("task_123")
 
         assert result == {}
 
-    @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_returns_error_on_artifacts_retrieval_failure(self, mock_task):
-        """get_task_artifacts returns error when artifact retrieval fails."""
-        mock_task.get_task.side_effect = Exception("Artifacts access denied")
-
-        result = await clearml_mcp.get_task_artifacts.fn("task_123")
-
-        assert "error" in result
-        assert "Failed to get task artifacts" in result["error"]
-
 
 class TestModelOperations:
     """Test model-related functions."""
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_get_model_info_with_input_and_output_models(self, mock_task):
+    async def test_get_model_info_with_input_and_output_models(
+        self, patched_task, mock_task_instance
+    ):
         """get_model_info returns model information for both input and output models."""
         # Arrange
-        input_model = Mock()
-        input_model.id = "input_model_1"
-        input_model.name = "pretrained_model"
-        input_model.url = "https://models.clearml.io/input.pkl"
-        input_model.framework = "pytorch"
-
-        output_model = Mock()
-        output_model.id = "output_model_1"
-        output_model.name = "trained_model"
-        output_model.url = "https://models.clearml.io/output.pkl"
-        output_model.framework = "pytorch"
-
-        task = Mock()
-        task.models = {
+        input_model = SimpleNamespace(
+            id="input_model_1",
+            name="pretrained_model",
+            url="https://models.clearml.io/input.pkl",
+            framework="pytorch",
+        )
+
+        output_model = SimpleNamespace(
+            id="output_model_1",
+            name="trained_model",
+            url="https://models.clearml.io/output.pkl",
+            framework="pytorch",
+        )
+
+        mock_task_instance.models = {
             "input": [input_model],
             "output": [output_model],
         }
 
-        mock_task.get_task.return_value = task
+        patched_task.get_task.return_value = mock_task_instance
 
         # Act
         result = await clearml_mcp.get_model_info.fn("task_123")
@@ -480,52 +556,41 @@ class TestModelOperations:
         assert result["output"][0]["name"] == "trained_model"
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_get_model_info_with_no_models(self, mock_task):
+    async def test_get_model_info_with_no_models(self, patched_task, mock_task_instance):
         """get_model_info handles tasks with no models."""
-        task = Mock()
-        task.models = {}
+        mock_task_instance.models = {}
 
-        mock_task.get_task.return_value = task
+        patched_task.get_task.return_value = mock_task_instance
 
         result = await clearml_mcp.get_model_info.fn("task_123")
 
         assert result["input"] == []
         assert result["output"] == []
 
-    @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_get_model_info_returns_error_on_failure(self, mock_task):
-        """get_model_info returns error when model retrieval fails."""
-        mock_task.get_task.side_effect = Exception("Model access denied")
-
-        result = await clearml_mcp.get_model_info.fn("task_123")
-
-        assert "error" in result
-        assert "Failed to get model info" in result["error"]
-
     @pytest.mark.asyncio
     @patch("clearml_mcp.clearml_mcp.Model")
     async def test_list_models_returns_model_list(self, mock_model):
         """list_models returns list of available models."""
         # Arrange
-        model1 = Mock()
-        model1.id = "model_1"
-        model1.name = "Model 1"
-        model1.project = "Project A"
-        model1.framework = "pytorch"
-        model1.created = "2024-01-01T00:00:00Z"
-        model1.tags = ["production", "v1.0"]
-        model1.task = "task_123"
-
-        model2 = Mock()
-        model2.id = "model_2"
-        model2.name = "Model 2"
-        model2.project = "Project B"
-        model2.framework = "tensorflow"
-        model2.created = "2024-01-02T00:00:00Z"
-        model2.tags = None
-        model2.task = "task_456"
+        model1 = SimpleNamespace(
+            id="model_1",
+            name="Model 1",
+            project="Project A",
+            framework="pytorch",
+            created="2024-01-01T00:00:00Z",
+            tags=["production", "v1.0"],
+            task="task_123",
+        )
+
+        model2 = SimpleNamespace(
+            id="model_2",
+            name="Model 2",
+            project="Project B",
+            framework="tensorflow",
+            created="2024-01-02T00:00:00Z",
+            tags=None,
+            task="task_456",
+        )
 
         mock_model.query_models.return_value = [model1, model2]
 
@@ -562,31 +627,33 @@ class TestModelOperations:
         assert "Failed to list models" in result[0]["error"]
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_get_model_artifacts_returns_artifact_details(self, mock_task):
+    async def test_get_model_artifacts_returns_artifact_details(
+        self, patched_task, mock_task_instance
+    ):
         """get_model_artifacts returns model artifact information."""
         # Arrange
-        input_model = Mock()
-        input_model.id = "input_1"
-        input_model.name = "base_model"
-        input_model.url = "https://models.clearml.io/base.pkl"
-        input_model.framework = "pytorch"
-        input_model.uri = "s3://bucket/base.pkl"
-
-        output_model = Mock()
-        output_model.id = "output_1"
-        output_model.name = "fine_tuned_model"
-        output_model.url = "https://models.clearml.io/finetuned.pkl"
-        output_model.framework = "pytorch"
-        output_model.uri = "s3://bucket/finetuned.pkl"
-
-        task = Mock()
-        task.models = {
+        input_model = SimpleNamespace(
+            id="input_1",
+            name="base_model",
+            url="https://models.clearml.io/base.pkl",
+            framework="pytorch",
+            uri="s3://bucket/base.pkl",
+        )
+
+        output_model = SimpleNamespace(
+            id="output_1",
+            name="fine_tuned_model",
+            url="https://models.clearml.io/finetuned.pkl",
+            framework="pytorch",
+            uri="s3://bucket/finetuned.pkl",
+        )
+
+        mock_task_instance.models = {
             "input": [input_model],
             "output": [output_model],
         }
 
-        mock_task.get_task.return_value = task
+        patched_task.get_task.return_value = mock_task_instance
 
         # Act
         result = await clearml_mcp.get_model_artifacts.fn("task_123")
@@ -599,39 +666,22 @@ class TestModelOperations:
         assert result["input_models"][0]["uri"] == "s3://bucket/base.pkl"
         assert result["output_models"][0]["uri"] == "s3://bucket/finetuned.pkl"
 
-    @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_get_model_artifacts_returns_error_on_failure(self, mock_task):
-        """get_model_artifacts returns error when retrieval fails."""
-        mock_task.get_task.side_effect = Exception("Model artifacts access denied")
-
-        result = await clearml_mcp.get_model_artifacts.fn("task_123")
-
-        assert "error" in result
-        assert "Failed to get model artifacts" in result["error"]
-
 
 class TestProjectSearch:
     """Test project search functions."""
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_find_project_by_pattern_returns_matching_projects(self, mock_task):
+    async def test_find_project_by_pattern_returns_matching_projects(self, patched_task):
         """find_project_by_pattern returns projects matching the pattern."""
         # Arrange
-        project1 = Mock()
-        project1.id = "proj_1"
-        project1.name = "Machine Learning Project"
+        project1 = SimpleNamespace(id="proj_1", name="Machine Learning Project")
 
-        project2 = Mock()
-        project2.id = "proj_2"
-        project2.name = "Data Analysis Project"
+        project2 = SimpleNamespace(id="proj_2", name="Data Analysis Project")
 
-        project3 = Mock()
-        project3.name = "Web Development"
+        project3 = SimpleNamespace(name="Web Development")
         # project3 has no id attribute
 
-        mock_task.get_projects.return_value = [project1, project2, project3]
+        patched_task.get_projects.return_value = [project1, project2, project3]
 
         # Act
         result = await clearml_mcp.find_project_by_pattern.fn("machine")
@@ -642,15 +692,12 @@ class TestProjectSearch:
         assert result[0]["id"] == "proj_1"
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_find_project_by_pattern_case_insensitive(self, mock_task):
+    async def test_find_project_by_pattern_case_insensitive(self, patched_task):
         """find_project_by_pattern performs case-insensitive matching."""
         # Arrange
-        project = Mock()
-        project.id = "proj_1"
-        project.name = "UPPER CASE PROJECT"
+        project = SimpleNamespace(id="proj_1", name="UPPER CASE PROJECT")
 
-        mock_task.get_projects.return_value = [project]
+        patched_task.get_projects.return_value = [project]
 
         # Act
         result = await clearml_mcp.find_project_by_pattern.fn("upper case")
@@ -660,10 +707,9 @@ class TestProjectSearch:
         assert result[0]["name"] == "UPPER CASE PROJECT"
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_find_project_by_pattern_returns_error_on_failure(self, mock_task):
+    async def test_find_project_by_pattern_returns_error_on_failure(self, patched_task):
         """find_project_by_pattern returns error when search fails."""
-        mock_task.get_projects.side_effect = Exception("Project access denied")
+        patched_task.get_projects.side_effect = Exception("Project access denied")
 
         result = await clearml_mcp.find_project_by_pattern.fn("test")
 
@@ -672,11 +718,10 @@ class TestProjectSearch:
         assert "Failed to find projects by pattern" in result[0]["error"]
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_find_experiment_in_project_returns_matching_experiments(self, mock_task):
+    async def test_find_experiment_in_project_returns_matching_experiments(self, patched_task):
         """find_experiment_in_project returns experiments matching the pattern."""
         # Arrange
-        mock_task.query_tasks.return_value = ["task_1", "task_2", "task_3"]
+        patched_task.query_tasks.return_value = ["task_1", "task_2", "task_3"]
 
         def mock_get_task(task_id):
             if task_id == "task_1":
@@ -704,7 +749,7 @@ class TestProjectSearch:
             task.data.created = "2024-01-03T00:00:00Z"
             return task
 
-        mock_task.get_task.side_effect = mock_get_task
+        patched_task.get_task.side_effect = mock_get_task
 
         # Act
         result = await clearml_mcp.find_experiment_in_project.fn("ML Project", "experiment")
@@ -715,11 +760,10 @@ class TestProjectSearch:
         assert result[1]["name"] == "Validation Experiment"
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_find_experiment_handles_task_access_failure(self, mock_task):
+    async def test_find_experiment_handles_task_access_failure(self, patched_task):
         """find_experiment_in_project handles individual task access failures."""
         # Arrange
-        mock_task.query_tasks.return_value = ["task_1", "task_2"]
+        patched_task.query_tasks.return_value = ["task_1", "task_2"]
 
         def mock_get_task(task_id):
             if task_id == "task_1":
@@ -732,7 +776,7 @@ class TestProjectSearch:
             task.data.created = "2024-01-02T00:00:00Z"
             return task
 
-        mock_task.get_task.side_effect = mock_get_task
+        patched_task.get_task.side_effect = mock_get_task
 
         # Act
         result = await clearml_mcp.find_experiment_in_project.fn("ML Project", "experiment")
@@ -742,10 +786,9 @@ class TestProjectSearch:
         assert result[0]["name"] == "Accessible Experiment"
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_find_experiment_returns_error_on_query_failure(self, mock_task):
+    async def test_find_experiment_returns_error_on_query_failure(self, patched_task):
         """find_experiment_in_project returns error when query fails."""
-        mock_task.query_tasks.side_effect = Exception("Query failed")
+        patched_task.query_tasks.side_effect = Exception("Query failed")
 
         result = await clearml_mcp.find_experiment_in_project.fn("ML Project", "test")
 
@@ -758,19 +801,14 @@ class TestProjectOperations:
     """Test project listing and statistics."""
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_lists_available_projects(self, mock_task):
+    async def test_lists_available_projects(self, patched_task):
         """list_projects returns available project information."""
         # Arrange
-        project1 = Mock()
-        project1.id = "proj_1"
-        project1.name = "Project Alpha"
+        project1 = SimpleNamespace(id="proj_1", name="Project Alpha")
 
-        project2 = Mock()
-        project2.id = "proj_2"
-        project2.name = "Project Beta"
+        project2 = SimpleNamespace(id="proj_2", name="Project Beta")
 
-        mock_task.get_projects.return_value = [project1, project2]
+        patched_task.get_projects.return_value = [project1, project2]
 
         # Act
         result = await clearml_mcp.list_projects.fn()
@@ -783,30 +821,22 @@ class TestProjectOperations:
         assert result[1]["name"] == "Project Beta"
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_handles_projects_without_id_attribute(self, mock_task):
+    async def test_handles_projects_without_id_attribute(self, patched_task):
         """list_projects handles projects missing id attribute gracefully."""
-        project = Mock()
-        project.name = "Project Without ID"
-
-        # Mock hasattr to return False for id attribute
-        def mock_hasattr(obj, attr):
-            return attr != "id"
+        project = SimpleNamespace(name="Project Without ID")
 
-        mock_task.get_projects.return_value = [project]
+        patched_task.get_projects.return_value = [project]
 
-        with patch("builtins.hasattr", side_effect=mock_hasattr):
-            result = await clearml_mcp.list_projects.fn()
+        result = await clearml_mcp.list_projects.fn()
 
         assert len(result) == 1
         assert result[0]["name"] == "Project Without ID"
         assert result[0]["id"] is None
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_list_projects_returns_error_on_failure(self, mock_task):
+    async def test_list_projects_returns_error_on_failure(self, patched_task):
         """list_projects returns error when project listing fails."""
-        mock_task.get_projects.side_effect = Exception("Project access denied")
+        patched_task.get_projects.side_effect = Exception("Project access denied")
 
         result = await clearml_mcp.list_projects.fn()
 
@@ -815,8 +845,7 @@ class TestProjectOperations:
         assert "Failed to list projects" in result[0]["error"]
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_calculates_project_statistics(self, mock_task):
+    async def test_calculates_project_statistics(self, patched_task):
         """get_project_stats returns project statistics correctly."""
         # Arrange: Create mock tasks with different statuses
         tasks = []
@@ -841,12 +870,10 @@ class TestProjectOperations:
         ]
 
         for i, status in enumerate(statuses):
-            task = Mock()
-            task.status = status
-            task.type = "training" if i % 2 == 0 else "inference"
+            task = SimpleNamespace(status=status, type="training" if i % 2 == 0 else "inference")
             tasks.append(task)
 
-        mock_task.query_tasks.return_value = tasks
+        patched_task.query_tasks.return_value = tasks
 
         # Act
         result = await clearml_mcp.get_project_stats.fn("Test Project")
@@ -860,10 +887,9 @@ class TestProjectOperations:
         assert result["status_breakdown"]["failed"] == 2
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_get_project_stats_returns_error_on_failure(self, mock_task):
+    async def test_get_project_stats_returns_error_on_failure(self, patched_task):
         """get_project_stats returns error when statistics calculation fails."""
-        mock_task.query_tasks.side_effect = Exception("Stats calculation failed")
+        patched_task.query_tasks.side_effect = Exception("Stats calculation failed")
 
         result = await clearml_mcp.get_project_stats.fn("Test Project")
 
@@ -875,8 +901,7 @@ class TestTaskComparison:
     """Test task comparison functionality."""
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_compares_multiple_tasks_with_specific_metrics(self, mock_task):
+    async def test_compares_multiple_tasks_with_specific_metrics(self, patched_task):
         """compare_tasks compares specified metrics across tasks."""
 
         # Arrange
@@ -898,7 +923,7 @@ class TestTaskComparison:
                 }
             return task
 
-        mock_task.get_task.side_effect = mock_get_task
+        patched_task.get_task.side_effect = mock_get_task
 
         # Act
         result = await clearml_mcp.compare_tasks.fn(["task_1", "task_2"], ["loss"])
@@ -911,20 +936,18 @@ class TestTaskComparison:
         assert "accuracy" not in result["task_1"]["metrics"]  # Only requested loss
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_compares_all_metrics_when_none_specified(self, mock_task):
+    async def test_compares_all_metrics_when_none_specified(self, patched_task, mock_task_instance):
         """compare_tasks compares all metrics when none specified."""
         # Arrange
-        task = Mock()
-        task.id = "task_1"
-        task.name = "Task 1"
-        task.status = "completed"
-        task.get_reported_scalars.return_value = {
+        mock_task_instance.id = "task_1"
+        mock_task_instance.name = "Task 1"
+        mock_task_instance.status = "completed"
+        mock_task_instance.get_reported_scalars.return_value = {
             "loss": {"train": {"y": [0.8, 0.6, 0.4]}},
             "accuracy": {"train": {"y": [0.7, 0.8, 0.9]}},
         }
 
-        mock_task.get_task.return_value = task
+        patched_task.get_task.return_value = mock_task_instance
 
         # Act
         result = await clearml_mcp.compare_tasks.fn(["task_1"], None)
@@ -935,20 +958,18 @@ class TestTaskComparison:
         assert "accuracy" in result["task_1"]["metrics"]
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_compare_tasks_handles_empty_metrics_data(self, mock_task):
+    async def test_compare_tasks_handles_empty_metrics_data(self, patched_task, mock_task_instance):
         """compare_tasks handles tasks with empty or missing metrics data."""
         # Arrange
-        task = Mock()
-        task.id = "task_1"
-        task.name = "Task 1"
-        task.status = "completed"
-        task.get_reported_scalars.return_value = {
+        mock_task_instance.id = "task_1"
+        mock_task_instance.name = "Task 1"
+        mock_task_instance.status = "completed"
+        mock_task_instance.get_reported_scalars.return_value = {
             "loss": {"train": {"y": []}},  # Empty data
             "accuracy": {"train": None},  # None data
         }
 
-        mock_task.get_task.return_value = task
+        patched_task.get_task.return_value = mock_task_instance
 
         # Act
         result = await clearml_mcp.compare_tasks.fn(["task_1"], ["loss", "accuracy"])
@@ -958,27 +979,15 @@ class TestTaskComparison:
         assert result["task_1"]["metrics"]["loss"] == {}
         assert result["task_1"]["metrics"]["accuracy"] == {}
 
-    @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_compare_tasks_returns_error_on_failure(self, mock_task):
-        """compare_tasks returns error when comparison fails."""
-        mock_task.get_task.side_effect = Exception("Task access denied")
-
-        result = await clearml_mcp.compare_tasks.fn(["task_1"], ["loss"])
-
-        assert "error" in result
-        assert "Failed to compare tasks" in result["error"]
-
 
 class TestTaskSearch:
     """Test task search functionality."""
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_searches_by_task_name(self, mock_task):
+    async def test_searches_by_task_name(self, patched_task):
         """search_tasks finds tasks by name matching."""
         # Arrange
-        mock_task.query_tasks.return_value = ["task_1", "task_2"]
+        patched_task.query_tasks.return_value = ["task_1", "task_2"]
 
         def mock_get_task(task_id):
             if task_id == "task_1":
@@ -1001,7 +1010,7 @@ class TestTaskSearch:
             task.comment = "Clean and prepare data"
             return task
 
-        mock_task.get_task.side_effect = mock_get_task
+        patched_task.get_task.side_effect = mock_get_task
 
         # Act
         result = await clearml_mcp.search_tasks.fn("neural")
@@ -1012,11 +1021,10 @@ class TestTaskSearch:
         assert result[0]["id"] == "task_1"
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_searches_by_tags_and_comments(self, mock_task):
+    async def test_searches_by_tags_and_comments(self, patched_task):
         """search_tasks finds tasks by tags and comments."""
         # Arrange
-        mock_task.query_tasks.return_value = ["task_1"]
+        patched_task.query_tasks.return_value = ["task_1"]
 
         def mock_get_task(task_id):
             task = Mock()
@@ -1029,7 +1037,7 @@ class TestTaskSearch:
             task.comment = "Optimized for speed"
             return task
 
-        mock_task.get_task.side_effect = mock_get_task
+        patched_task.get_task.side_effect = mock_get_task
 
         # Act: Search by tag
         result = await clearml_mcp.search_tasks.fn("production")
@@ -1046,11 +1054,10 @@ class TestTaskSearch:
         assert result[0]["comment"] == "Optimized for speed"
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_returns_empty_list_when_no_matches(self, mock_task):
+    async def test_returns_empty_list_when_no_matches(self, patched_task):
         """search_tasks returns empty list when no tasks match."""
         # Arrange
-        mock_task.query_tasks.return_value = ["task_1"]
+        patched_task.query_tasks.return_value = ["task_1"]
 
         def mock_get_task(task_id):
             task = Mock()
@@ -1063,7 +1070,7 @@ class TestTaskSearch:
             task.comment = "Nothing relevant"
             return task
 
-        mock_task.get_task.side_effect = mock_get_task
+        patched_task.get_task.side_effect = mock_get_task
 
         # Act
         result = await clearml_mcp.search_tasks.fn("nonexistent")
@@ -1072,11 +1079,10 @@ class TestTaskSearch:
         assert result == []
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_search_tasks_handles_individual_task_failures(self, mock_task):
+    async def test_search_tasks_handles_individual_task_failures(self, patched_task):
         """search_tasks handles individual task access failures."""
         # Arrange
-        mock_task.query_tasks.return_value = ["task_1", "task_2"]
+        patched_task.query_tasks.return_value = ["task_1", "task_2"]
 
         def mock_get_task(task_id):
             if task_id == "task_1":
@@ -1091,7 +1097,7 @@ class TestTaskSearch:
             task.comment = "This works"
             return task
 
-        mock_task.get_task.side_effect = mock_get_task
+        patched_task.get_task.side_effect = mock_get_task
 
         # Act
         result = await clearml_mcp.search_tasks.fn("task")
@@ -1103,10 +1109,9 @@ class TestTaskSearch:
         assert result[1]["name"] == "Accessible Task"
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_search_tasks_returns_error_on_query_failure(self, mock_task):
+    async def test_search_tasks_returns_error_on_query_failure(self, patched_task):
         """search_tasks returns error when query fails."""
-        mock_task.query_tasks.side_effect = Exception("Search query failed")
+        patched_task.query_tasks.side_effect = Exception("Search query failed")
 
         result = await clearml_mcp.search_tasks.fn("test")
 
@@ -1115,11 +1120,10 @@ class TestTaskSearch:
         assert "Failed to search tasks" in result[0]["error"]
 
     @pytest.mark.asyncio
-    @patch("clearml_mcp.clearml_mcp.Task")
-    async def test_search_tasks_handles_missing_comment_and_tags(self, mock_task):
+    async def test_search_tasks_handles_missing_comment_and_tags(self, patched_task):
         """search_tasks handles tasks with missing comment and tags."""
         # Arrange
-        mock_task.query_tasks.return_value = ["task_1"]
+        patched_task.query_tasks.return_value = ["task_1"]
 
         def mock_get_task(task_id):
             task = Mock()
@@ -1132,7 +1136,7 @@ class TestTaskSearch:
             task.comment = None  # No comment
             return task
 
-        mock_task.get_task.side_effect = mock_get_task
+        patched_task.get_task.side_effect = mock_get_task
 
         # Act
         result = await clearml_mcp.search_tasks.fn("simple")
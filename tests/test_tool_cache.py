@@ -0,0 +1,113 @@
+"""Behavioral tests for the examples' on-disk tool result cache."""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+pytest.importorskip("smolagents", reason="examples dependencies not installed")
+sys.path.insert(0, str(Path(__file__).parents[1] / "examples"))
+tool_cache = pytest.importorskip("tool_cache")
+
+
+@pytest.fixture
+def remote_tool():
+    """A stand-in for a smolagents MCP tool."""
+    tool = Mock(return_value=[{"id": "task_123"}])
+    tool.name = "list_tasks"
+    tool.description = "List tasks"
+    tool.inputs = {}
+    tool.output_type = "object"
+    return tool
+
+
+@pytest.fixture
+def cached(remote_tool, tmp_path):
+    """The stand-in tool wrapped in a cache stored under tmp_path."""
+    return tool_cache.CachedTool(remote_tool, tool_cache.ToolResultCache(tmp_path / "cache.sqlite"))
+
+
+class TestCachedTool:
+    """Test which calls are served from the cache."""
+
+    def test_repeated_call_is_served_from_cache(self, cached, remote_tool):
+        """Identical calls reach the wrapped tool once."""
+        first = cached(project_name="ML Project")
+        second = cached(project_name="ML Project")
+
+        assert first == second == [{"id": "task_123"}]
+        remote_tool.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            pytest.param({"error": "ClearML unavailable"}, id="dict"),
+            pytest.param([{"error": "ClearML unavailable"}], id="list"),
+            pytest.param('[{"error": "ClearML unavailable"}]', id="json-list"),
+        ],
+    )
+    def test_errors_are_not_cached(self, cached, remote_tool, error):
+        """A failed call is retried rather than replayed from the cache."""
+        remote_tool.return_value = error
+        cached(project_name="ML Project")
+        cached(project_name="ML Project")
+
+        assert remote_tool.call_count == 2
+
+    def test_positional_arguments_are_part_of_the_key(self, cached, remote_tool):
+        """Calls with different positional arguments don't share an entry."""
+        cached()
+        remote_tool.return_value = [{"id": "task_456"}]
+
+        assert cached("ML Project", "completed") == [{"id": "task_456"}]
+        assert remote_tool.call_count == 2
+
+    def test_other_clearml_server_is_not_served_from_cache(
+        self, remote_tool, tmp_path, monkeypatch
+    ):
+        """Results cached for one ClearML API host aren't returned for another."""
+        path = tmp_path / "cache.sqlite"
+        monkeypatch.setenv("CLEARML_API_HOST", "https://api.clear.ml")
+        tool_cache.CachedTool(remote_tool, tool_cache.ToolResultCache(path))()
+        monkeypatch.setenv("CLEARML_API_HOST", "https://clearml.example.com")
+        tool_cache.CachedTool(remote_tool, tool_cache.ToolResultCache(path))()
+
+        assert remote_tool.call_count == 2
+
+
+def _remote_tool(name):
+    """A stand-in for a live MCP tool called name."""
+    return SimpleNamespace(name=name, description=name, inputs={}, output_type="object")
+
+
+class TestLazyMCPClient:
+    """Test that cached tool schemas follow changes to the server's tools."""
+
+    @pytest.fixture
+    def server_tools(self, monkeypatch):
+        """The tools the stubbed MCP server provides; tests replace the list in place."""
+        tools = []
+
+        def connect(_server_params):
+            return SimpleNamespace(get_tools=lambda: list(tools), disconnect=lambda *_: None)
+
+        monkeypatch.setattr(tool_cache, "MCPClient", connect)
+        return tools
+
+    def test_renamed_tool_refreshes_cached_schemas(self, server_tools, tmp_path):
+        """A tool renamed on the server fails clearly and the next client sees the new name."""
+        server_params = SimpleNamespace(command="clearml-mcp", args=[])
+        schema_cache = tool_cache.ToolSchemaCache(tmp_path / "schemas.json")
+        server_tools[:] = [_remote_tool("old_tool")]
+        tool_cache.LazyMCPClient(server_params, schema_cache)
+
+        server_tools[:] = [_remote_tool("new_tool")]
+        client = tool_cache.LazyMCPClient(server_params, schema_cache)
+        assert [tool.name for tool in client.get_tools()] == ["old_tool"]
+        with pytest.raises(RuntimeError, match="no longer provides 'old_tool'"):
+            client.remote_tool("old_tool")
+
+        client = tool_cache.LazyMCPClient(server_params, schema_cache)
+        assert [tool.name for tool in client.get_tools()] == ["new_tool"]